@@ -27,7 +27,21 @@
 # For more information and documentation, please go to https://support.saleae.com/extensions/high-level-analyzer-extensions
 
 
-from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame
+import os
+import sys
+
+from saleae.analyzers import ChoiceSetting, NumberSetting, StringSetting
+
+# the decoder is shared with the other EmbeddedVideoEngine extensions and lives next to their directories
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from eve_core import (  # noqa: E402
+    ARG_DATA, ARG_FORMAT, ARG_IMAGE, ARG_OPAQUE, ARG_STRING, ARG_ZLIB,
+    REGION_CMDB, REGION_RAM_CMD, REGION_RAM_DL, REGION_RAM_G, REGION_REG, REGION_ROM,
+    Engine, FT81xProfile,
+)
 
 # host command codes
 COMMANDS = {
@@ -311,150 +325,127 @@ COPRO_COMMANDS = {
     0xFFFFFF65: "CMD_WAIT"
 }
 
-def decode_read_response(miso_buffer):
-    """
-    Extracts up to 4 bytes of little-endian return data from MISO after the 3-byte header and dummy byte.
-    Returns formatted hex string or None.
-    """
-    miso_bytes = [b for _, _, b in miso_buffer]
-
-    if len(miso_bytes) <= 4:
-        return None  # Not enough bytes (need 3 header + 1 dummy + at least 1 data)
-
-    data_bytes = miso_bytes[4:]  # Skip 3-byte addr + dummy
-    if not data_bytes:
-        return None
-
-    if len(data_bytes) > 4:
-        data_bytes = data_bytes[:4]  # Only take max 4
-
-    value = int.from_bytes(data_bytes, byteorder='little')
-    return f"0x{value:0{len(data_bytes) * 2}X}"
+# layout of the co-processor command arguments following the command word
+# a number counts 32-bit argument words, tuples describe a payload and reference the argument with the length or options
+COPRO_ARGS = {
+    "CMD_APPEND": (2,),
+    "CMD_BGCOLOR": (1,),
+    "CMD_BUTTON": (3, (ARG_FORMAT, 2, 16)),
+    "CMD_CALIBRATE": (1,),
+    "CMD_CLOCK": (4,),
+    "CMD_DIAL": (3,),
+    "CMD_FGCOLOR": (1,),
+    "CMD_GAUGE": (4,),
+    "CMD_GETMATRIX": (6,),
+    "CMD_GETPROPS": (3,),
+    "CMD_GETPTR": (1,),
+    "CMD_GRADCOLOR": (1,),
+    "CMD_GRADIENT": (4,),
+    "CMD_INFLATE": (1, (ARG_ZLIB, None)),
+    "CMD_INTERRUPT": (1,),
+    "CMD_KEYS": (3, (ARG_STRING,)),
+    "CMD_LOADIMAGE": (2, (ARG_IMAGE, 1)),
+    "CMD_MEDIAFIFO": (2,),
+    "CMD_MEMCPY": (3,),
+    "CMD_MEMCRC": (3,),
+    "CMD_MEMSET": (3,),
+    "CMD_MEMWRITE": (2, (ARG_DATA, 1)),
+    "CMD_MEMZERO": (2,),
+    "CMD_NUMBER": (3,),
+    "CMD_PLAYVIDEO": (1, (ARG_OPAQUE, 0)),
+    "CMD_PROGRESS": (4,),
+    "CMD_REGREAD": (2,),
+    "CMD_ROMFONT": (2,),
+    "CMD_ROTATE": (1,),
+    "CMD_SCALE": (2,),
+    "CMD_SCROLLBAR": (4,),
+    "CMD_SETBASE": (1,),
+    "CMD_SETBITMAP": (3,),
+    "CMD_SETFONT": (2,),
+    "CMD_SETFONT2": (3,),
+    "CMD_SETROTATE": (1,),
+    "CMD_SETSCRATCH": (1,),
+    "CMD_SKETCH": (4,),
+    "CMD_SLIDER": (4,),
+    "CMD_SNAPSHOT": (1,),
+    "CMD_SNAPSHOT2": (4,),
+    "CMD_SPINNER": (2,),
+    "CMD_TEXT": (2, (ARG_FORMAT, 1, 16)),
+    "CMD_TOGGLE": (3, (ARG_FORMAT, 2, 0)),
+    "CMD_TRACK": (3,),
+    "CMD_TRANSLATE": (2,),
+    "CMD_VIDEOFRAME": (2,),
+    "CMD_BITMAP_TRANSFORM": (13,),
+    "CMD_FLASHWRITE": (2, (ARG_DATA, 1)),
+    "CMD_FLASHREAD": (3,),
+    "CMD_FLASHUPDATE": (3,),
+    "CMD_FLASHFAST": (1,),
+    "CMD_FLASHSPITX": (1, (ARG_DATA, 0)),
+    "CMD_FLASHSPIRX": (2,),
+    "CMD_FLASHSOURCE": (1,),
+    "CMD_INFLATE2": (2, (ARG_ZLIB, 1)),
+    "CMD_ROTATEAROUND": (4,),
+    "CMD_ANIMSTART": (3,),
+    "CMD_ANIMSTOP": (1,),
+    "CMD_ANIMXY": (2,),
+    "CMD_ANIMDRAW": (1,),
+    "CMD_GRADIENTA": (4,),
+    "CMD_FILLWIDTH": (1,),
+    "CMD_APPENDF": (2,),
+    "CMD_ANIMFRAME": (3,),
+    "CMD_ANIMFRAMERAM": (3,),
+    "CMD_ANIMSTARTRAM": (3,),
+    "CMD_APILEVEL": (1,),
+    "CMD_CALIBRATESUB": (3,),
+    "CMD_CALLLIST": (1,),
+    "CMD_FLASHPROGRAM": (3,),
+    "CMD_FONTCACHE": (3,),
+    "CMD_FONTCACHEQUERY": (2,),
+    "CMD_GETIMAGE": (5,),
+    "CMD_HSF": (1,),
+    "CMD_LINETIME": (1,),
+    "CMD_NEWLIST": (1,),
+    "CMD_PCLKFREQ": (3,),
+    "CMD_RUNANIM": (2,),
+    "CMD_WAIT": (1,),
+}
 
-def decode_write_data(mosi_buffer):
+# memory map as (first address, last address, region), later entries take precedence over earlier ones
+MEMORY_MAP = (
+    (0x000000, 0x0FFFFF, REGION_RAM_G),
+    (0x1E0000, 0x2FFFFF, REGION_ROM),
+    (0x300000, 0x301FFF, REGION_RAM_DL),
+    (0x302000, 0x302FFF, REGION_REG),
+    (0x302578, 0x30257B, REGION_CMDB),
+    (0x308000, 0x308FFF, REGION_RAM_CMD),
+    (0x309000, 0x309FFF, REGION_REG),
+)
+
+# size of RAM-DL
+RAM_DL_SIZE = 0x2000
+
+PROFILE = FT81xProfile(
+    commands=COMMANDS,
+    registers=REGISTERS,
+    dl_commands=DL_COMMANDS,
+    copro_commands=COPRO_COMMANDS,
+    copro_args=COPRO_ARGS,
+    memory_map=MEMORY_MAP,
+    ram_dl_size=RAM_DL_SIZE
+)
+
+class Hla(Engine):
     """
-    Extracts up to 4 bytes of little-endian write data from MOSI after the 3-byte header.
-    Returns formatted hex string or None.
+    Decoder for the SPI traffic of FT81x / BT81x chips.
     """
-    mosi_bytes = [b for _, _, b in mosi_buffer]
-
-    if len(mosi_bytes) <= 3:
-        return None  # No data bytes
-
-    data_bytes = mosi_bytes[3:]  # Skip 3-byte header
-    if not data_bytes:
-        return None
-
-    if len(data_bytes) > 4:
-        data_bytes = data_bytes[:4]  # Max 4 bytes
-
-    value = int.from_bytes(data_bytes, byteorder='little')
-    return f"0x{value:0{len(data_bytes) * 2}X}"
-
-class Hla(HighLevelAnalyzer):
-    result_types = {
-        'command': {'format': '{}'},
-        'read': {'format': '{} from 0x{:06X} = 0x{:X}'},
-        'write': {'format': '{} to 0x{:06X} = 0x{:X}'}
-    }
-
-    def __init__(self):
-        self.frame_buffer_mosi = []
-        self.frame_start_time = None
-
-    def decode(self, frame: AnalyzerFrame):
-        if frame.type == 'enable':
-            self.frame_buffer_mosi = []
-            self.frame_buffer_miso = []
-            self.frame_start_time = frame.start_time
-            return None
-
-        elif frame.type == 'result':
-            raw_mosi = frame.data.get('mosi')
-            raw_miso = frame.data.get('miso')
-
-            if (raw_mosi is None) or (raw_miso is None):
-                return None
-
-            mosi_byte = raw_mosi[0]
-            miso_byte = raw_miso[0]
-
-            self.frame_buffer_mosi.append((frame.start_time, frame.end_time, mosi_byte))
-            self.frame_buffer_miso.append((frame.start_time, frame.end_time, miso_byte))
-
-            return None
-
-        elif frame.type == 'disable':
-            if len(self.frame_buffer_mosi) < 3:
-                return None  # Not enough for any known frame
-
-            mosi_bytes = [b for (_, _, b) in self.frame_buffer_mosi]
-            start_time = self.frame_start_time or self.frame_buffer_mosi[0][0]
-            end_time = self.frame_buffer_mosi[-1][1]
-
-            # --- HOST COMMAND FRAME (3 bytes total) ---
-            if len(mosi_bytes) == 3:
-                cmd = mosi_bytes[0]
-                cmd_name = COMMANDS.get(cmd, f"UNKNOWN_CMD (0x{cmd:02X})")
-                return AnalyzerFrame(cmd_name, start_time, end_time, {})
-
-            # --- Read/Write frame (address = 3 bytes, then variable-length data) ---
-            if len(mosi_bytes) >= 4:
-                addr22 = (
-                    ((mosi_bytes[0] & 0x3f) << 16) |
-                    (mosi_bytes[1] << 8) |
-                    mosi_bytes[2]
-                )
-                addr = 0x00000000 | addr22
-
-                is_write = (mosi_bytes[0] & 0x80) != 0
-                op = "WRITE" if (mosi_bytes[0] & 0x80) else "READ"
-
-                # Resolve register label or dynamic RAM-DL offset
-                if 0x300000 <= addr <= 0x301FFF:
-                    offset = addr - 0x300000
-                    label = f"RAM-DL+0x{offset:04X}"
-                else:
-                    label = REGISTERS.get(addr, f"0x{addr:08X}")
-
-                text = f"{op} {label}"
-
-                if is_write:
-                    # WRITE Frame
-                    value_str = decode_write_data(self.frame_buffer_mosi)
-
-                    if len(value_str) == 10 and (label.startswith("RAM-DL+0x") or label == 'REG_CMDB_WRITE'):
-                        value_int = int(value_str, 16)
-                        cmd_name = COPRO_COMMANDS.get(value_int, value_str)
-
-                        if cmd_name != value_str:
-                            value_str = cmd_name
-                        else:
-                            cmd_key = value_int & 0xFF000000
-                            cmd_name = DL_COMMANDS.get(cmd_key)
-
-                            if cmd_name:
-                                value_str = f"{cmd_name} + 0x{value_int & 0x00FFFFFF:06X}"
-
-                            if mosi_bytes[6] & 0xC0 == 0x40:
-                                value_str = f"'DL_VERTEX2F' + 0x{value_int & 0x3FFFFFFF:08X}"
-
-                            if mosi_bytes[6] & 0xC0 == 0x80:
-                                value_str = f"'DL_VERTEX2II' + 0x{value_int & 0x3FFFFFFF:08X}"
-
-                    return AnalyzerFrame(text, start_time, end_time, {
-                        "data": value_str
-                    })
-
-                else:
-                    # READ Frame
-                    if len(self.frame_buffer_mosi) < 5:
-                        return None  # Need at least dummy + 1 return byte
-
-                    value_str = decode_read_response(self.frame_buffer_miso)
-
-                    return AnalyzerFrame(text, start_time, end_time, {
-                        "data": value_str or "READ_ERROR"
-                    })
-
-            return None
+    profile = PROFILE
+
+    mode = ChoiceSetting(choices=('Decode', 'Bandwidth', 'FIFO', 'Frames'), label='Mode')
+    detail = ChoiceSetting(choices=('Full command stream', 'Registers', 'Transactions only', 'Statistics only'),
+                           label='Decode detail')
+    filter = StringSetting(label='Filter: registers, regions, address ranges, commands')
+    window = NumberSetting(label='Summary window [ms]', min_value=1, max_value=60000)
+    polling = ChoiceSetting(choices=('Collapse', 'Show every read'), label='Polling loops')
+    writes = ChoiceSetting(choices=('Coalesce', 'Show every write'), label='RAM_G writes')
+    shadow = ChoiceSetting(choices=('Off', 'Shadow'), label='RAM_G shadow')
+    export = StringSetting(label='Columnar export directory')
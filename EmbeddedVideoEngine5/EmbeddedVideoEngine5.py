@@ -27,7 +27,21 @@
 # For more information and documentation, please go to https://support.saleae.com/extensions/high-level-analyzer-extensions
 
 
-from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame
+import os
+import sys
+
+from saleae.analyzers import ChoiceSetting, NumberSetting, StringSetting
+
+# the decoder is shared with the other EmbeddedVideoEngine extensions and lives next to their directories
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from eve_core import (  # noqa: E402
+    ARG_DATA, ARG_FORMAT, ARG_IMAGE, ARG_OPAQUE, ARG_STRING, ARG_ZLIB, OPT_FS,
+    REGION_CMDB, REGION_RAM_CMD, REGION_RAM_DL, REGION_RAM_G, REGION_REG,
+    BT82xProfile, Engine,
+)
 
 # host command codes
 COMMANDS = {
@@ -379,206 +393,171 @@ COPRO_COMMANDS = {
     0xFFFFFF83: "CMD_WATCHDOG"
 }
 
-BOOT_STATUS = {
-    "0x492E2E2E": "Coprocessor is running",
-    "0x4F2E2E2E": "Read system configuration",
-    "0x442E2E2E": "DDR initialization started",
-    "0x444D3038": "DDR initialization, waiting for DDR initialization done",
-    "0x44433035": "DDR initialization, waiting for DDR out of reset",
-    "0x44553135": "DDR initialization, 150 us delay",
-    "0x44553730": "DDR initialization, 700 us delay",
-    "0x552E2E2E": "Decompressing rom main image to DDR",
-    "0x432E2E2E": "Copying into program memory",
-    "0x562E2E2E": "Decompressing rom asset image to DDR",
-    "0x4C2E2E2E": "Initializing local variables",
-    "0x542E2E2E": "Copying into touch program memory",
-    "0x462E2E2E": "Attempting to attach to flash",
-    "0x522E2E2E": "Normal running",
-    "0x452E2E2E": "DDR shutdown started",
-    "0x454D3130": "DDR shutdown, waiting for DDR enter self-refresh state",
-    "0x45433034": "DDR shutdown, waiting for DDR enter reset",
-    "0x5A2E2E2E": "DDR shutdown state",
-    "0x572E2E2E": "DDR warm start, started",
-    "0x57433035": "DDR warm start, waiting for DDR out of reset",
-    "0x574D3038": "DDR warm start, waiting for DDR initialization done",
-    "0x574D3130": "DDR warm start, waiting for DDR enter self-refresh state",
-    "0x576D3130": "DDR warm start, waiting for DDR not in self-refresh state",
-    "0x57553135": "DDR warm start, 150 us delay",
+# layout of the co-processor command arguments following the command word
+# a number counts 32-bit argument words, tuples describe a payload and reference the argument with the length or options
+COPRO_ARGS = {
+    "CMD_ANIMDRAW": (1,),
+    "CMD_ANIMFRAME": (3,),
+    "CMD_ANIMSTART": (3,),
+    "CMD_ANIMSTOP": (1,),
+    "CMD_ANIMXY": (2,),
+    "CMD_APPEND": (2,),
+    "CMD_APPENDF": (2,),
+    "CMD_ARC": (3,),
+    "CMD_BGCOLOR": (1,),
+    "CMD_BITMAP_TRANSFORM": (13,),
+    "CMD_BUTTON": (3, (ARG_FORMAT, 2, 16)),
+    "CMD_CALIBRATE": (1,),
+    "CMD_CALIBRATESUB": (3,),
+    "CMD_CALLLIST": (1,),
+    "CMD_CGRADIENT": (5,),
+    "CMD_CLOCK": (4,),
+    "CMD_COPYLIST": (1,),
+    "CMD_DIAL": (3,),
+    "CMD_ENABLEREGION": (1,),
+    "CMD_FGCOLOR": (1,),
+    "CMD_FILLWIDTH": (1,),
+    "CMD_FLASHFAST": (1,),
+    "CMD_FLASHPROGRAM": (3,),
+    "CMD_FLASHREAD": (3,),
+    "CMD_FLASHSOURCE": (1,),
+    "CMD_FLASHSPIRX": (2,),
+    "CMD_FLASHSPITX": (1, (ARG_DATA, 0)),
+    "CMD_FLASHUPDATE": (3,),
+    "CMD_FLASHWRITE": (2, (ARG_DATA, 1)),
+    "CMD_FSDIR": (2, (ARG_STRING,), 1),
+    "CMD_FSOPTIONS": (1,),
+    "CMD_FSREAD": (1, (ARG_STRING,), 1),
+    "CMD_FSSIZE": ((ARG_STRING,), 1),
+    "CMD_FSSOURCE": ((ARG_STRING,), 1),
+    "CMD_GAUGE": (4,),
+    "CMD_GETIMAGE": (5,),
+    "CMD_GETMATRIX": (6,),
+    "CMD_GETPROPS": (3,),
+    "CMD_GETPTR": (1,),
+    "CMD_GLOW": (2,),
+    "CMD_GRADCOLOR": (1,),
+    "CMD_GRADIENT": (4,),
+    "CMD_GRADIENTA": (4,),
+    "CMD_I2SSTARTUP": (1,),
+    "CMD_INFLATE": (2, (ARG_ZLIB, 1)),
+    "CMD_INTERRUPT": (1,),
+    "CMD_KEYS": (3, (ARG_STRING,)),
+    "CMD_LOADASSET": (2, (ARG_OPAQUE, 1)),
+    "CMD_LOADIMAGE": (2, (ARG_IMAGE, 1)),
+    "CMD_LOADWAV": (2, (ARG_OPAQUE, 1)),
+    "CMD_MEDIAFIFO": (2,),
+    "CMD_MEMCPY": (3,),
+    "CMD_MEMCRC": (3,),
+    "CMD_MEMSET": (3,),
+    "CMD_MEMWRITE": (2, (ARG_DATA, 1)),
+    "CMD_MEMZERO": (2,),
+    "CMD_NEWLIST": (1,),
+    "CMD_NUMBER": (3,),
+    "CMD_PLAYVIDEO": (1, (ARG_OPAQUE, 0)),
+    "CMD_PLAYWAV": (1, (ARG_OPAQUE, 0)),
+    "CMD_PROGRESS": (4,),
+    "CMD_REGREAD": (2,),
+    "CMD_REGWRITE": (2,),
+    "CMD_RENDERTARGET": (3,),
+    "CMD_RESULT": (1,),
+    "CMD_ROMFONT": (2,),
+    "CMD_ROTATE": (1,),
+    "CMD_ROTATEAROUND": (4,),
+    "CMD_RUNANIM": (2,),
+    "CMD_SCALE": (2,),
+    "CMD_SCROLLBAR": (4,),
+    "CMD_SDATTACH": (2,),
+    "CMD_SDBLOCKREAD": (4,),
+    "CMD_SETBASE": (1,),
+    "CMD_SETBITMAP": (3,),
+    "CMD_SETFONT": (3,),
+    "CMD_SETROTATE": (1,),
+    "CMD_SETSCRATCH": (1,),
+    "CMD_SKETCH": (4,),
+    "CMD_SKIPCOND": (5,),
+    "CMD_SLIDER": (4,),
+    "CMD_SNAPSHOT": (1,),
+    "CMD_SPINNER": (2,),
+    "CMD_TEXT": (2, (ARG_FORMAT, 1, 16)),
+    "CMD_TEXTDIM": (2, (ARG_FORMAT, 1, 16)),
+    "CMD_TOGGLE": (3, (ARG_FORMAT, 2, 0)),
+    "CMD_TRACK": (3,),
+    "CMD_TRANSLATE": (2,),
+    "CMD_VIDEOFRAME": (2,),
+    "CMD_VIDEOSTART": (1,),
+    "CMD_WAIT": (1,),
+    "CMD_WAITCHANGE": (1,),
+    "CMD_WAITCOND": (4,),
+    "CMD_WATCHDOG": (1,),
 }
 
-def decode_read_response(miso_buffer):
-    """
-    Finds sync byte (0x01) in MISO buffer, decodes the following
-    1, 2, or 4 bytes (whichever applies) in reverse byte order.
-    Returns formatted hex string or None.
-    """
-    miso_bytes = [b for _, _, b in miso_buffer]
-
-    try:
-        sync_index = miso_bytes.index(0x01)
-    except ValueError:
-        return None  # Sync byte not found
-
-    data_bytes = miso_bytes[sync_index + 1:]
-    data_len = len(data_bytes)
-
-    # Try longest possible value first
-    if data_len >= 4:
-        length = 4
-    elif data_len >= 2:
-        length = 2
-    elif data_len >= 1:
-        length = 1
-    else:
-        return None  # No data after sync byte
-
-    reversed_bytes = data_bytes[:length][::-1]
-    value = 0
-    for b in reversed_bytes:
-        value = (value << 8) | b
-
-    return f"0x{value:0{length * 2}X}"
+# memory map as (first address, last address, region), later entries take precedence over earlier ones
+# RAM_G is the DDR, its actual size depends on the DDR fitted
+MEMORY_MAP = (
+    (0x00000000, 0x3FFFFFFF, REGION_RAM_G),
+    (0x7F000000, 0x7F003FFF, REGION_RAM_CMD),
+    (0x7F004000, 0x7F007FFF, REGION_REG),
+    (0x7F008000, 0x7F00BFFF, REGION_RAM_DL),
+    (0x7F010000, 0x7F010003, REGION_CMDB),
+    (0x7F800000, 0x7F8FFFFF, REGION_REG),
+)
+
+# REG_BOOT_STATUS reads are decoded with this table
+BOOT_STATUS = {
+    0x492E2E2E: "Coprocessor is running",
+    0x4F2E2E2E: "Read system configuration",
+    0x442E2E2E: "DDR initialization started",
+    0x444D3038: "DDR initialization, waiting for DDR initialization done",
+    0x44433035: "DDR initialization, waiting for DDR out of reset",
+    0x44553135: "DDR initialization, 150 us delay",
+    0x44553730: "DDR initialization, 700 us delay",
+    0x552E2E2E: "Decompressing rom main image to DDR",
+    0x432E2E2E: "Copying into program memory",
+    0x562E2E2E: "Decompressing rom asset image to DDR",
+    0x4C2E2E2E: "Initializing local variables",
+    0x542E2E2E: "Copying into touch program memory",
+    0x462E2E2E: "Attempting to attach to flash",
+    0x522E2E2E: "Normal running",
+    0x452E2E2E: "DDR shutdown started",
+    0x454D3130: "DDR shutdown, waiting for DDR enter self-refresh state",
+    0x45433034: "DDR shutdown, waiting for DDR enter reset",
+    0x5A2E2E2E: "DDR shutdown state",
+    0x572E2E2E: "DDR warm start, started",
+    0x57433035: "DDR warm start, waiting for DDR out of reset",
+    0x574D3038: "DDR warm start, waiting for DDR initialization done",
+    0x574D3130: "DDR warm start, waiting for DDR enter self-refresh state",
+    0x576D3130: "DDR warm start, waiting for DDR not in self-refresh state",
+    0x57553135: "DDR warm start, 150 us delay",
+}
 
-def decode_write(mosi_buffer, number=0):
+# size of RAM-DL
+RAM_DL_SIZE = 0x4000
+
+PROFILE = BT82xProfile(
+    commands=COMMANDS,
+    registers=REGISTERS,
+    dl_commands=DL_COMMANDS,
+    copro_commands=COPRO_COMMANDS,
+    copro_args=COPRO_ARGS,
+    memory_map=MEMORY_MAP,
+    ram_dl_size=RAM_DL_SIZE,
+    file_option=OPT_FS,
+    boot_status=BOOT_STATUS
+)
+
+class Hla(Engine):
     """
-    Decode a 32-bit write word from the MOSI buffer.
-
-    Parameters:
-    - mosi_buffer: list of (start_time, end_time, byte) tuples
-    - number: which 32-bit word to decode, 0 = bytes 4..7, 1 = bytes 8..11, etc.
-
-    Returns:
-    - hex string like '0x12345678' or None if not enough bytes
+    Decoder for the SPI traffic of BT82x chips.
     """
-    # Calculate start index of the requested 32-bit word in buffer
-    start_index = 4 + (number * 4)
-    end_index = start_index + 4
-
-    if len(mosi_buffer) < end_index:
-        return None  # Not enough data for this word
-
-    # Extract bytes
-    word_bytes = [b for _, _, b in mosi_buffer[start_index:end_index]]
-
-    # Reverse byte order (assuming little endian)
-    word_bytes.reverse()
-
-    # Convert bytes to integer
-    value = 0
-    for b in word_bytes:
-        value = (value << 8) | b
-
-    # Format as hex string
-    return f"0x{value:08X}"
-
-class Hla(HighLevelAnalyzer):
-    result_types = {
-        'active': {'format': 'ACTIVE'},
-        'command': {'format': '{cmd_name}'},
-    }
-
-    def __init__(self):
-        self.frame_buffer_mosi = []
-        self.frame_buffer_miso = []
-        self.frame_start_time = None
-
-    def decode(self, frame: AnalyzerFrame):
-        if frame.type == 'enable':
-            self.frame_buffer_mosi = []
-            self.frame_buffer_miso = []
-            self.frame_start_time = frame.start_time
-            return None
-
-        elif frame.type == 'result':
-            raw_mosi = frame.data.get('mosi')
-            raw_miso = frame.data.get('miso')
-
-            if (raw_mosi is None) or (raw_miso is None):
-                return None
-
-            mosi_byte = raw_mosi[0]
-            miso_byte = raw_miso[0]
-
-            self.frame_buffer_mosi.append((frame.start_time, frame.end_time, mosi_byte))
-            self.frame_buffer_miso.append((frame.start_time, frame.end_time, miso_byte))
-
-            return None
-
-        elif frame.type == 'disable':
-            if not self.frame_buffer_mosi:
-                return None
-
-            mosi_bytes = [b for (_, _, b) in self.frame_buffer_mosi]
-            start_time = self.frame_start_time or self.frame_buffer_mosi[0][0]
-            end_time = self.frame_buffer_mosi[-1][1]
-
-            # Case 1: All 5 bytes are 0x00 -> ACTIVE
-            if len(mosi_bytes) == 5 and all(b == 0x00 for b in mosi_bytes):
-                return AnalyzerFrame('ACTIVE', start_time, end_time, {})
-
-            # Case 2: Special 0xFF command frame
-            if len(mosi_bytes) == 5 and mosi_bytes[0] == 0xFF and (mosi_bytes[1] & 0xF0) == 0xE0:
-                cmd = mosi_bytes[1]
-                cmd_name = COMMANDS.get(cmd, f"UNKNOWN_CMD (0x{cmd:02X})")
-                return AnalyzerFrame(cmd_name, start_time, end_time, {})
-
-            # Case 3: Read/Write frame
-            if len(mosi_bytes) >= 4:
-                addr = (
-                    ((mosi_bytes[0] & 0x7f) << 24) |
-                    (mosi_bytes[1] << 16) |
-                    (mosi_bytes[2] << 8) |
-                    mosi_bytes[3]
-                )
-
-                is_write = (mosi_bytes[0] & 0x80) != 0
-
-                op = "WRITE" if (mosi_bytes[0] & 0x80) else "READ"
-
-                # Resolve register label or dynamic RAM-DL offset
-                if 0x7F008000 <= addr <= 0x7F00BFFF:
-                    offset = addr - 0x7F008000
-                    label = f"RAM-DL+0x{offset:04X}"
-                else:
-                    label = REGISTERS.get(addr, f"0x{addr:08X}")
-
-                text = f"{op} {label}"
-
-                if is_write:
-                    # WRITE Frame
-                    value_str = decode_write(self.frame_buffer_mosi, 0)
-
-                    if label.startswith("RAM-DL+0x") or label == 'REG_CMDB_WRITE':
-                        value_int = int(value_str, 16)
-                        cmd_name = COPRO_COMMANDS.get(value_int, value_str)
-
-                        if cmd_name != value_str:
-                            value_str = cmd_name
-                        else:
-                            cmd_key = value_int & 0xFF000000
-                            cmd_name = DL_COMMANDS.get(cmd_key)
-                            if cmd_name:
-                                value_str = f"{cmd_name} + 0x{value_int & 0x00FFFFFF:06X}"
-
-                            if mosi_bytes[7] & 0xC0 == 0x40:
-                                value_str = f"'DL_VERTEX2F' + 0x{value_int & 0x3FFFFFFF:08X}"
-
-                            if mosi_bytes[7] & 0xC0 == 0x80:
-                                value_str = f"'DL_VERTEX2II' + 0x{value_int & 0x3FFFFFFF:08X}"
-
-                    return AnalyzerFrame(text, start_time, end_time, {
-                        "data": value_str
-                    })
-
-                else:
-                    # READ Frame
-                    value_str = decode_read_response(self.frame_buffer_miso)
-
-                    if label == 'REG_BOOT_STATUS':
-                        value_str = BOOT_STATUS.get(value_str, value_str)
-
-                    return AnalyzerFrame(text, start_time, end_time, {
-                        "data": value_str or "READ_ERROR"
-                    })
-
-            return None
+    profile = PROFILE
+
+    mode = ChoiceSetting(choices=('Decode', 'Bandwidth', 'FIFO', 'Frames'), label='Mode')
+    detail = ChoiceSetting(choices=('Full command stream', 'Registers', 'Transactions only', 'Statistics only'),
+                           label='Decode detail')
+    filter = StringSetting(label='Filter: registers, regions, address ranges, commands')
+    window = NumberSetting(label='Summary window [ms]', min_value=1, max_value=60000)
+    polling = ChoiceSetting(choices=('Collapse', 'Show every read'), label='Polling loops')
+    writes = ChoiceSetting(choices=('Coalesce', 'Show every write'), label='RAM_G writes')
+    shadow = ChoiceSetting(choices=('Off', 'Shadow'), label='RAM_G shadow')
+    export = StringSetting(label='Columnar export directory')
@@ -0,0 +1,37 @@
+# Shared decoder for the EmbeddedVideoEngine extensions
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Logic 2 loads every extension from its own directory, the extensions add the directory above theirs
+# to sys.path to import this package.
+
+from .copro import (ARG_DATA, ARG_FORMAT, ARG_IMAGE, ARG_OPAQUE, ARG_STRING, ARG_ZLIB,
+                    OPT_FLASH, OPT_FORMAT, OPT_FS, OPT_MEDIAFIFO, CoproParser)
+from .engine import Engine
+from .export import ColumnarExport, read_columns
+from .filters import TransactionFilter
+from .memory import (REGION_CMDB, REGION_NAMES, REGION_NONE, REGION_RAM_CMD, REGION_RAM_DL, REGION_RAM_G,
+                     REGION_REG, REGION_ROM, MemoryMap)
+from .profile import BT82xProfile, FT81xProfile, Profile
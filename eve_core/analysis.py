@@ -0,0 +1,787 @@
+# Display list shadow, bus statistics and polling loop detection for the EVE decoders
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import bisect
+import math
+import zlib
+from collections import deque
+
+from saleae.analyzers import AnalyzerFrame
+
+from .memory import REGION_CMDB, REGION_NAMES, REGION_NONE, REGION_RAM_CMD, REGION_RAM_DL, REGION_RAM_G, REGION_REG, REGION_ROM
+from .state import PlainState, pack_bytes, unpack_bytes
+
+# the DL_DISPLAY command that ends a display list
+DL_DISPLAY_WORD = b'\0\0\0\0'
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of the sorted values by the nearest-rank method.
+    """
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class DisplayList:
+    """
+    Shadow of RAM-DL, updated with every write from the host and compared on every write to REG_DLSWAP.
+    Display lists the co-processor builds from CMD_DLSTART ... CMD_SWAP never show up on SPI and are not tracked.
+    """
+    def __init__(self, size):
+        self.memory = bytearray(size)
+        self.committed = b''  # the list of the last commit
+        self.end = 0          # highest word index + 1 written since the last commit
+        self.uploaded = 0     # bytes written since the last commit
+        self.hash = 0
+
+    def write(self, offset, data):
+        """
+        Copies the whole 32-bit words of a write to RAM-DL into the shadow.
+        """
+        memory = self.memory
+        length = min(len(data) & ~3, len(memory) - offset)
+        if length <= 0 or offset & 3:
+            return
+
+        memory[offset:offset + length] = data[:length]
+        self.uploaded += length
+        end = (offset + length) >> 2
+        if end > self.end:
+            self.end = end
+
+    def length(self):
+        """
+        Returns the number of words up to and including the first DL_DISPLAY,
+        without one the list ends with the last word written to since the last commit or before.
+        """
+        memory = self.memory
+        pos = memory.find(DL_DISPLAY_WORD)
+        while pos > 0 and pos & 3:
+            pos = memory.find(DL_DISPLAY_WORD, (pos | 3) + 1)
+        if pos >= 0:
+            return (pos >> 2) + 1
+        return max(self.end, len(self.committed) >> 2)
+
+    def commit(self):
+        """
+        Takes the list in the shadow the last commit as the current one.
+        Returns a dict with the word count, CRC32, changed words against the previous list,
+        the first changed word (-1 for none) and the bytes written since the last commit.
+        """
+        committed = self.committed
+        count = self.length()
+        current = bytes(self.memory[:count * 4])
+        crc = zlib.crc32(current)
+
+        if crc == self.hash and current == committed:
+            changed = 0
+            first = -1
+        else:
+            common = min(len(current), len(committed)) >> 2
+            old = memoryview(committed).cast('I')[:common]
+            new = memoryview(current).cast('I')[:common]
+            diffs = [index for index in range(common) if old[index] != new[index]]
+            changed = len(diffs) + abs(count - (len(committed) >> 2))
+            first = diffs[0] if diffs else common
+
+        result = {
+            "count": count,
+            "hash": crc,
+            "changed": changed,
+            "first": first,
+            "uploaded": self.uploaded,
+            "identical": changed == 0
+        }
+
+        self.committed = current
+        self.hash = crc
+        self.end = 0
+        self.uploaded = 0
+        return result
+
+    def state(self):
+        return {
+            "memory": pack_bytes(self.memory),
+            "committed": pack_bytes(self.committed),
+            "end": self.end,
+            "uploaded": self.uploaded,
+            "hash": self.hash
+        }
+
+    def restore(self, state):
+        self.memory[:] = unpack_bytes(state["memory"])
+        self.committed = unpack_bytes(state["committed"])
+        self.end = state["end"]
+        self.uploaded = state["uploaded"]
+        self.hash = state["hash"]
+
+
+class BusStatistics(PlainState):
+    """
+    Running counters of the SPI traffic, summarized in one frame per time window.
+    """
+    STATE = ("start_time", "end_time", "transactions", "region_bytes", "other_bytes", "busy", "idle", "polls",
+             "poll_bytes")
+
+    def __init__(self, window):
+        self.window = window  # seconds
+        self.start_time = None
+        self.end_time = None
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.region_bytes = [0] * len(REGION_NAMES)
+        self.other_bytes = 0  # host commands and transactions too short for an address
+        self.busy = 0.0       # time with chip select active
+        self.idle = 0.0       # time between transactions
+        self.polls = 0
+        self.poll_bytes = 0
+
+    def add(self, region, length, poll, start_time, end_time):
+        """
+        Counts a transaction, region is None for host commands.
+        Returns the summary frame of the previous window when the transaction starts a new one.
+        """
+        frame = None
+        if self.start_time is None:
+            self.start_time = start_time
+        elif float(start_time - self.start_time) >= self.window:
+            frame = self.summary()
+            self.reset()
+            self.start_time = start_time
+        else:
+            self.idle += float(start_time - self.end_time)
+
+        self.transactions += 1
+        self.busy += float(end_time - start_time)
+        if region is None:
+            self.other_bytes += length
+        else:
+            self.region_bytes[region] += length
+        if poll:
+            self.polls += 1
+            self.poll_bytes += length
+
+        self.end_time = end_time
+        return frame
+
+    def summary(self):
+        """
+        Returns the frame for the transactions counted since the last reset or None if there were none.
+        """
+        if not self.transactions:
+            return None
+
+        region_bytes = self.region_bytes
+        total = sum(region_bytes) + self.other_bytes
+        duration = float(self.end_time - self.start_time) or 1e-9
+
+        return AnalyzerFrame('bandwidth', self.start_time, self.end_time, {
+            "transactions": self.transactions,
+            "bytes": total,
+            "reg": region_bytes[REGION_REG],
+            "cmd": region_bytes[REGION_RAM_CMD] + region_bytes[REGION_CMDB],
+            "dl": region_bytes[REGION_RAM_DL],
+            "ram_g": region_bytes[REGION_RAM_G],
+            "other": region_bytes[REGION_NONE] + region_bytes[REGION_ROM] + self.other_bytes,
+            "bytes_per_second": round(total / duration),
+            "utilization": round(100 * self.busy / duration, 1),
+            "idle": self.idle,
+            "polls": self.polls,
+            "poll_bytes": self.poll_bytes
+        })
+
+
+class PollCollapser(PlainState):
+    """
+    Collapses consecutive reads of the same polling register into one frame.
+    A run ends with the first read that returns a different value or with any other transaction,
+    a run of a single read is shown as a normal read.
+    """
+    STATE = ("count", "addr", "first", "last", "start_time", "end_time", "wait")
+
+    def __init__(self, read_frame, registers):
+        self.read_frame = read_frame
+        self.registers = registers
+        self.count = 0
+        self.addr = None
+        self.first = None
+        self.last = None
+        self.start_time = None
+        self.end_time = None
+        self.wait = None   # most wait bytes of a read in the run, BT82x only
+
+    def add(self, addr, value, start_time, end_time, wait=None):
+        """
+        Adds a read of a polling register, returns the frame of a run that is complete or None.
+        """
+        frame = None
+        if self.count:
+            if addr == self.addr:
+                self.count += 1
+                self.end_time = end_time
+                if wait is not None and (self.wait is None or wait > self.wait):
+                    self.wait = wait
+                if value == self.last:
+                    return None
+                self.last = value
+                return self.flush()
+            frame = self.flush()
+
+        self.count = 1
+        self.addr = addr
+        self.first = value
+        self.last = value
+        self.start_time = start_time
+        self.end_time = end_time
+        self.wait = wait
+        return frame
+
+    def flush(self):
+        """
+        Returns the frame for the pending run or None.
+        """
+        count = self.count
+        if not count:
+            return None
+
+        self.count = 0
+        if count == 1:
+            frame = self.read_frame(self.addr, self.first, self.start_time, self.end_time)
+            if self.wait is not None:
+                frame.data["wait"] = self.wait
+            return frame
+
+        data = {
+            "register": self.registers.get(self.addr),
+            "address": self.addr,
+            "count": count,
+            "duration": float(self.end_time - self.start_time),
+            "first": self.first,
+            "last": self.last
+        }
+        if self.wait is not None:
+            data["wait_max"] = self.wait
+        return AnalyzerFrame('poll', self.start_time, self.end_time, data)
+
+
+class BulkWriter(PlainState):
+    """
+    Coalesces writes to consecutive addresses of RAM_G, long bursts as well as back-to-back transactions,
+    into one frame with the CRC32 of the data and the throughput.
+    A single write of up to 4 bytes is shown as a normal write.
+    """
+    STATE = ("count", "addr", "offset", "end", "length", "crc", "value", "unchanged", "start_time", "end_time")
+
+    def __init__(self, write_frame, shadow=None):
+        self.write_frame = write_frame
+        self.shadow = shadow  # RamShadow for the running upload statistics on the frames
+        self.count = 0
+        self.addr = None
+        self.offset = None
+        self.end = None
+        self.length = 0
+        self.crc = 0
+        self.value = None
+        self.unchanged = False
+        self.start_time = None
+        self.end_time = None
+
+    def continues(self, addr):
+        """
+        Returns True if a write to addr continues the pending run.
+        """
+        return bool(self.count) and addr == self.end
+
+    def add(self, addr, offset, data, unchanged, start_time, end_time):
+        """
+        Adds a write, returns the frame of the previous run if this write does not continue it, otherwise None.
+        """
+        frame = None
+        if self.count:
+            if addr == self.end:
+                self.count += 1
+                self.end += len(data)
+                self.length += len(data)
+                self.crc = zlib.crc32(data, self.crc)
+                self.unchanged = self.unchanged and unchanged
+                self.end_time = end_time
+                return None
+            frame = self.flush()
+
+        self.count = 1
+        self.addr = addr
+        self.offset = offset
+        self.end = addr + len(data)
+        self.length = len(data)
+        self.crc = zlib.crc32(data)
+        self.value = int.from_bytes(data[:4], byteorder='little')
+        self.unchanged = unchanged
+        self.start_time = start_time
+        self.end_time = end_time
+        return frame
+
+    def flush(self):
+        """
+        Returns the frame for the pending run or None.
+        """
+        count = self.count
+        if not count:
+            return None
+
+        self.count = 0
+        if count == 1 and self.length <= 4:
+            return self.write_frame(self.addr, self.value, self.unchanged, self.start_time, self.end_time)
+
+        duration = float(self.end_time - self.start_time)
+        data = {
+            "region": REGION_NAMES[REGION_RAM_G],
+            "offset": self.offset,
+            "address": self.addr,
+            "end": self.end,
+            "length": self.length,
+            "transactions": count,
+            "crc32": self.crc,
+            "duration": duration,
+            "throughput": round(self.length / duration / 1e6, 3) if duration else 0.0
+        }
+        if self.unchanged:
+            data["unchanged"] = True
+        if self.shadow is not None:
+            data.update(self.shadow.counters())
+        return AnalyzerFrame('bulk_write', self.start_time, self.end_time, data)
+
+
+class AnomalyLog(PlainState):
+    """
+    Counts the malformed transactions by kind.
+    """
+    STATE = ("counts",)
+    KINDS = ("truncated", "invalid", "short_read", "no_sync", "read_only", "unaligned")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.KINDS, 0)
+
+    def add(self, kind):
+        """
+        Counts an anomaly, returns how many of its kind were seen so far.
+        """
+        count = self.counts[kind] + 1
+        self.counts[kind] = count
+        return count
+
+    def summary(self, time):
+        """
+        Returns a frame with the counters at the given time or None if there was nothing to count.
+        """
+        total = sum(self.counts.values())
+        if not total:
+            return None
+
+        data = dict(self.counts)
+        data["total"] = total
+        return AnalyzerFrame('anomalies', time, time, data)
+
+
+class WaitStates:
+    """
+    Histogram of the wait bytes the reads spent before the data, per register or region,
+    with the time from the end of the header to the sync byte.
+    """
+    def __init__(self):
+        self.targets = {}    # register or region -> [{wait bytes: reads}, total time, longest time]
+        self.changed = set()  # registers and regions with reads since the last report
+        self.report_time = None
+
+    def add(self, target, wait, duration):
+        entry = self.targets.get(target)
+        if entry is None:
+            entry = self.targets[target] = [{}, 0.0, 0.0]
+        histogram = entry[0]
+        histogram[wait] = histogram.get(wait, 0) + 1
+        entry[1] += duration
+        if duration > entry[2]:
+            entry[2] = duration
+        self.changed.add(target)
+
+    def report(self, time, interval):
+        """
+        Returns the frames of the registers and regions read since the last report once per interval seconds,
+        otherwise None, Logic 2 shows these instead of the summary at the end.
+        """
+        if self.report_time is None:
+            self.report_time = time
+            return None
+        if float(time - self.report_time) < interval:
+            return None
+
+        self.report_time = time
+        frames = self.summary(time, self.changed)
+        self.changed = set()
+        return frames
+
+    def summary(self, time, targets=None):
+        """
+        Returns one frame per register or region at the given time, the ones with the most reads first,
+        only the ones in targets if given.
+        """
+        frames = []
+        for target, (histogram, total_time, max_time) in self.targets.items():
+            if targets is not None and target not in targets:
+                continue
+            reads = sum(histogram.values())
+            waits = sorted(histogram)
+            frames.append(AnalyzerFrame('wait_states', time, time, {
+                "register": target,
+                "reads": reads,
+                "mean": round(sum(wait * count for wait, count in histogram.items()) / reads, 2),
+                "min": waits[0],
+                "max": waits[-1],
+                "histogram": " ".join("%d:%d" % (wait, histogram[wait]) for wait in waits),
+                "time_mean": total_time / reads,
+                "time_max": max_time
+            }))
+        frames.sort(key=lambda frame: -frame.data["reads"])
+        return frames
+
+    def state(self):
+        # the histograms as lists of pairs, JSON only has string keys
+        return {
+            "targets": {target: [sorted(histogram.items()), total_time, max_time]
+                        for target, (histogram, total_time, max_time) in self.targets.items()},
+            "changed": sorted(self.changed),
+            "report_time": self.report_time
+        }
+
+    def restore(self, state):
+        self.targets = {target: [dict(histogram), total_time, max_time]
+                        for target, (histogram, total_time, max_time) in state["targets"].items()}
+        self.changed = set(state["changed"])
+        self.report_time = state["report_time"]
+
+
+class FifoTracker:
+    """
+    Model of the co-processor command FIFO in RAM_CMD, fed with the bursts the host writes and the values
+    of REG_CMD_WRITE, REG_CMD_READ and REG_CMDB_SPACE it writes or reads.
+    Positions count the bytes since the start of the capture and never wrap, the read position is only known
+    once the host has read REG_CMD_READ or REG_CMDB_SPACE, so the resolution is that of the polling.
+    """
+    BOUNDARIES = ("CMD_DLSTART", "CMD_SWAP")
+
+    def __init__(self, size):
+        self.size = size
+        self.written = 0         # write position
+        self.read = None         # read position
+        self.occupancy = None
+        self.markers = deque()   # (position after the command, command, time written) for CMD_DLSTART and CMD_SWAP
+
+    def queue(self, offset, length, boundaries, time):
+        """
+        Adds a burst written to REG_CMDB_WRITE (offset is None) or to RAM_CMD at offset,
+        boundaries are (command, end of the command in the burst) tuples.
+        """
+        if offset is None:
+            base = self.written
+            self.written += length & ~3
+        else:
+            base = self.written + (offset - self.written) % self.size
+
+        for name, end in boundaries:
+            self.markers.append((base + end, name, time))
+
+    def set_write(self, value):
+        self.written += (value - self.written) % self.size
+
+    def set_read(self, value):
+        if value & 3 or value >= self.size:
+            return  # co-processor fault
+        self.read = self.written - (self.written - value) % self.size
+
+    def set_space(self, value):
+        if value & 3 or value > self.size - 4:
+            return
+        self.read = self.written - (self.size - 4 - value)
+
+    def update(self, start_time, end_time):
+        """
+        Returns a frame if the occupancy changed or a CMD_DLSTART / CMD_SWAP was consumed by the co-processor,
+        otherwise None.
+        """
+        read = self.read
+        if read is None:
+            return None
+
+        markers = self.markers
+        drained = None
+        count = 0
+        while markers and markers[0][0] <= read:
+            drained = markers.popleft()
+            count += 1
+
+        occupancy = self.written - read
+        if drained is None and occupancy == self.occupancy:
+            return None
+
+        self.occupancy = occupancy
+        data = {
+            "occupancy": occupancy,
+            "free": self.size - 4 - occupancy,
+            "write": self.written % self.size,
+            "read": read % self.size
+        }
+        if drained is None:
+            return AnalyzerFrame('fifo', start_time, end_time, data)
+
+        _, name, written_time = drained
+        data["boundary"] = name
+        data["latency"] = float(end_time - written_time)
+        data["drained"] = count
+        return AnalyzerFrame('fifo_drain', start_time, end_time, data)
+
+    def state(self):
+        return {"written": self.written, "read": self.read, "occupancy": self.occupancy, "markers": list(self.markers)}
+
+    def restore(self, state):
+        self.written = state["written"]
+        self.read = state["read"]
+        self.occupancy = state["occupancy"]
+        self.markers = deque(tuple(marker) for marker in state["markers"])
+
+
+class FrameProfiler:
+    """
+    Splits the capture into rendered frames at CMD_SWAP and at writes to REG_DLSWAP
+    and counts the SPI traffic of every frame.
+    """
+    def __init__(self):
+        self.durations = []     # times between two frame ends, sorted
+        self.start_time = None  # end of the previous frame or start of the first transaction
+        self.end_time = None
+        self.complete = False   # the current frame started at the end of another one
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.polls = 0
+        self.commands = {}
+        self.payloads = {}  # command -> payload bytes
+
+    def add(self, length, poll, start_time, end_time):
+        """
+        Counts a transaction.
+        """
+        if self.start_time is None:
+            self.start_time = start_time
+        elif self.end_time is not None:
+            self.idle += float(start_time - self.end_time)
+
+        self.transactions += 1
+        self.bytes += length
+        self.busy += float(end_time - start_time)
+        if poll:
+            self.polls += 1
+        self.end_time = end_time
+
+    def command(self, name):
+        self.commands[name] = self.commands.get(name, 0) + 1
+
+    def payload(self, name, length):
+        self.payloads[name] = self.payloads.get(name, 0) + length
+
+    def boundary(self):
+        """
+        Ends the current frame with the last transaction counted, returns its summary frame.
+        """
+        start_time = self.start_time
+        end_time = self.end_time
+        duration = float(end_time - start_time)
+        durations = self.durations
+        if self.complete:
+            bisect.insort(durations, duration)
+
+        commands = self.commands
+        payloads = self.payloads
+        frame = AnalyzerFrame('render', start_time, end_time, {
+            "duration": duration,
+            "complete": self.complete,
+            "transactions": self.transactions,
+            "bytes": self.bytes,
+            "commands": sum(commands.values()),
+            "command_types": ", ".join("%s %d" % item for item in sorted(commands.items(), key=lambda item: -item[1])),
+            "payload": sum(payloads.values()),
+            "payload_types": ", ".join("%s %d" % item for item in sorted(payloads.items(), key=lambda item: -item[1])),
+            "polls": self.polls,
+            "busy": self.busy,
+            "idle": self.idle,
+            # running percentiles of the complete frames so far, 0 before the first one
+            "p50": percentile(durations, 50) if durations else 0.0,
+            "p95": percentile(durations, 95) if durations else 0.0,
+            "p99": percentile(durations, 99) if durations else 0.0
+        })
+
+        self.reset()
+        self.start_time = end_time
+        self.complete = True
+        return frame
+
+    def summary(self):
+        """
+        Returns the frame with the percentiles of the frame times, placed after the last complete frame,
+        or None if there was none.
+        """
+        durations = self.durations
+        if not durations:
+            return None
+
+        return AnalyzerFrame('render_stats', self.start_time, self.end_time, {
+            "count": len(durations),
+            "mean": sum(durations) / len(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "max": durations[-1]
+        })
+
+
+class RamShadow:
+    """
+    Sparse shadow of RAM_G in pages that are only allocated when written, so the 1 GB of DDR on BT82x
+    costs nothing for the parts a capture never touches.
+    Every page has a bit mask of the bytes written so far, reads are only checked against those.
+    """
+    PAGE_SHIFT = 12
+    PAGE_SIZE = 1 << PAGE_SHIFT
+
+    def __init__(self):
+        self.pages = {}      # page number -> [bytearray, bit mask of the written bytes]
+        self.written = 0     # bytes written
+        self.unchanged = 0   # bytes written with the content they already had
+        self.uploads = 0
+        self.repeated = 0    # uploads that did not change anything
+        self.current = False  # the upload so far did not change anything
+
+    def write(self, addr, data, continued=False):
+        """
+        Copies data into the shadow, returns True if the content was already there.
+        A page only counts as unchanged when all the bytes written to it were known and identical.
+        continued adds the data to the previous upload, a co-processor command delivers its payload in parts.
+        """
+        page_size = self.PAGE_SIZE
+        pages = self.pages
+        length = len(data)
+        unchanged = 0
+        pos = 0
+
+        while pos < length:
+            offset = (addr + pos) & (page_size - 1)
+            size = min(page_size - offset, length - pos)
+            page = pages.get((addr + pos) >> self.PAGE_SHIFT)
+            if page is None:
+                page = pages[(addr + pos) >> self.PAGE_SHIFT] = [bytearray(page_size), 0]
+
+            memory = page[0]
+            bits = ((1 << size) - 1) << offset
+            chunk = data[pos:pos + size]
+            if page[1] & bits == bits and memory[offset:offset + size] == chunk:
+                unchanged += size
+            else:
+                memory[offset:offset + size] = chunk
+                page[1] |= bits
+            pos += size
+
+        self.written += length
+        self.unchanged += unchanged
+        same = bool(length) and unchanged == length
+        if not continued:
+            self.uploads += 1
+            self.current = same
+            self.repeated += same
+        elif self.current and not same:
+            self.current = False
+            self.repeated -= 1
+        return same
+
+    def counters(self):
+        """
+        Returns the running upload statistics for the frames of the writes to RAM_G.
+        """
+        return {"ram_g_written": self.written, "ram_g_unchanged": self.unchanged, "ram_g_repeated": self.repeated}
+
+    def read(self, addr, length):
+        """
+        Returns the expected content for a read or None if not all of the bytes were written before.
+        """
+        page = self.pages.get(addr >> self.PAGE_SHIFT)
+        offset = addr & (self.PAGE_SIZE - 1)
+        if page is None or offset + length > self.PAGE_SIZE:
+            return None
+
+        bits = ((1 << length) - 1) << offset
+        if page[1] & bits != bits:
+            return None
+        return bytes(page[0][offset:offset + length])
+
+    def summary(self, time):
+        """
+        Returns a frame with the upload statistics at the given time or None if nothing was written.
+        """
+        if not self.uploads:
+            return None
+
+        return AnalyzerFrame('ram_g', time, time, {
+            "written": self.written,
+            "unchanged": self.unchanged,
+            "uploads": self.uploads,
+            "repeated": self.repeated,
+            "pages": len(self.pages)
+        })
+
+    def state(self):
+        """
+        Returns the written pages and the upload statistics, the bit mask of a page as a hex string.
+        """
+        return {
+            "pages": {str(number): [pack_bytes(page[0]), format(page[1], 'x')] for number, page in self.pages.items()},
+            "written": self.written,
+            "unchanged": self.unchanged,
+            "uploads": self.uploads,
+            "repeated": self.repeated,
+            "current": self.current
+        }
+
+    def restore(self, state):
+        self.pages = {int(number): [bytearray(unpack_bytes(memory)), int(bits, 16)]
+                      for number, (memory, bits) in state["pages"].items()}
+        self.written = state["written"]
+        self.unchanged = state["unchanged"]
+        self.uploads = state["uploads"]
+        self.repeated = state["repeated"]
+        self.current = state["current"]
@@ -0,0 +1,335 @@
+# Parser for the co-processor command stream of the EVE chips
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import re
+import zlib
+
+from .state import pack_bytes, unpack_bytes
+
+# co-processor command options that change the length of a command
+OPT_MEDIAFIFO = 0x10
+OPT_FLASH = 0x40
+OPT_FORMAT = 0x1000
+OPT_FS = 0x2000  # BT82x only, OPT_FILL on the older chips
+
+# variable length payloads in COPRO_ARGS
+ARG_STRING = 1  # null-terminated string, padded to 4 bytes
+ARG_FORMAT = 2  # string, followed by one word per conversion if OPT_FORMAT is set
+ARG_DATA = 3    # as many bytes as given by an argument, padded to 4 bytes
+ARG_ZLIB = 4    # zlib stream, not present with OPT_MEDIAFIFO or OPT_FLASH, a file name with OPT_FS
+ARG_IMAGE = 5   # PNG or JPEG image, not present with OPT_MEDIAFIFO or OPT_FLASH, a file name with OPT_FS
+ARG_OPAQUE = 6  # data of unknown length, extends to the end of the burst
+
+# conversions in OPT_FORMAT strings, each one and each '*' width or precision takes an argument word
+FORMAT_SPEC = re.compile(rb'%[-+ #0]*(\*|\d*)(?:\.(\*|\d*))?l?([diouxXcs%])')
+
+
+class CoproParser:
+    """
+    Incremental parser for the co-processor command stream written to REG_CMDB_WRITE or RAM_CMD.
+    Commands that are incomplete at the end of a burst are continued with the next burst.
+    """
+    CONTINUED = 1  # command started in a previous burst
+    CONTINUES = 2  # command is not complete at the end of the burst
+
+    # attributes of a command in progress, the layout and the current entry follow from the name and the step
+    STATE = ("name", "opcode", "args", "step", "payload", "delivered", "unchanged", "text", "compressed", "inflated",
+             "format", "kind", "words", "remain", "skip", "head", "chunk")
+
+    def __init__(self, commands, arguments, file_option=0):
+        self.commands = commands
+        self.arguments = arguments
+        self.file_option = file_option  # OPT_FS on BT82x, the payload is a file name instead
+        # called with (command, arguments, offset, data) for ARG_DATA payloads and inflated ARG_ZLIB data,
+        # returns True if the data was already known
+        self.sink = None
+        self.name = None
+        self.done = False
+
+    def start(self, name, opcode):
+        self.name = name
+        self.opcode = opcode
+        self.args = []
+        self.layout = self.arguments.get(name, ())
+        self.step = 0
+        self.payload = 0
+        self.delivered = 0
+        self.unchanged = None  # all of the data passed to the sink so far was known
+        self.text = None      # string argument
+        self.compressed = 0   # bytes of the zlib stream consumed
+        self.inflated = 0     # bytes the zlib stream inflated to
+        self.format = None    # image format
+        self.done = False
+        self.next()
+
+    def next(self):
+        """
+        Advances to the next entry of the command layout, sets done when the command is complete.
+        """
+        layout = self.layout
+        while self.step < len(layout):
+            entry = layout[self.step]
+            self.step += 1
+
+            if isinstance(entry, int):
+                self.kind = None
+                self.words = entry
+                return
+
+            kind = entry[0]
+            if kind == ARG_DATA:
+                self.remain = (self.args[entry[1]] + 3) & ~3
+                if not self.remain:
+                    continue
+            elif kind in (ARG_ZLIB, ARG_IMAGE, ARG_OPAQUE):
+                options = self.args[entry[1]] if entry[1] is not None else 0
+                if options & (OPT_MEDIAFIFO | OPT_FLASH):
+                    continue
+                if options & self.file_option:
+                    kind = ARG_STRING
+                self.stream = zlib.decompressobj() if kind == ARG_ZLIB else None
+                self.skip = 0
+                self.head = b''
+                self.format = None
+            if kind == ARG_STRING or kind == ARG_FORMAT:
+                self.text = bytearray()
+
+            self.kind = kind
+            self.entry = entry
+            return
+
+        self.done = True
+
+    def feed(self, data, start=0):
+        """
+        Parses the words in data from offset start on.
+        Returns a list of (first word, last word, name, opcode, arguments, payload bytes, flags, details) tuples,
+        name is None for words that are not co-processor commands, details is a dict from details() or None.
+        """
+        result = []
+        size = start + ((len(data) - start) & ~3)
+        pos = start
+        first = 0
+        flags = self.CONTINUED if self.name is not None else 0
+
+        while pos < size:
+            if self.name is None:
+                first = (pos - start) >> 2
+                word = int.from_bytes(data[pos:pos + 4], 'little')
+                pos += 4
+                name = self.commands.get(word)
+                if name is None:
+                    result.append((first, first, None, word, (), 0, 0, None))
+                    continue
+                self.start(name, word)
+            elif self.kind is None:
+                self.args.append(int.from_bytes(data[pos:pos + 4], 'little'))
+                pos += 4
+                self.words -= 1
+                if not self.words:
+                    self.next()
+            else:
+                pos = self.consume(data, pos, size)
+
+            if self.done:
+                result.append((first, ((pos - start) >> 2) - 1, self.name, self.opcode, tuple(self.args), self.payload, flags,
+                               self.details()))
+                self.name = None
+                self.done = False
+                flags = 0
+
+        if self.name is not None and size > start + first * 4:
+            result.append((first, ((size - start) >> 2) - 1, self.name, self.opcode, tuple(self.args), self.payload,
+                           flags | self.CONTINUES, self.details()))
+
+        return result
+
+    def consume(self, data, pos, size):
+        """
+        Consumes payload bytes, returns the new position.
+        """
+        kind = self.kind
+        end = -1
+
+        if kind == ARG_DATA:
+            end = min(pos + self.remain, size)
+            if self.sink is not None:
+                self.deliver(data[pos:min(end, pos + self.args[self.entry[1]] - self.delivered)])
+            self.remain -= end - pos
+            self.payload += end - pos
+            if not self.remain:
+                self.next()
+            return end
+
+        if kind == ARG_STRING or kind == ARG_FORMAT:
+            end = data.find(0, pos, size)
+            self.text += data[pos:size if end < 0 else end]
+            if end < 0:
+                self.payload += size - pos
+                return size
+            end += 1
+        elif kind == ARG_ZLIB:
+            try:
+                with memoryview(data) as view:
+                    output = self.stream.decompress(view[pos:size])
+                self.inflated += len(output)
+                if self.sink is not None and output:
+                    self.deliver(output)
+            except zlib.error:
+                end = size
+            else:
+                if self.stream.eof:
+                    end = size - len(self.stream.unused_data)
+            self.compressed += (size if end < 0 else end) - pos
+        elif kind == ARG_IMAGE:
+            end = self.image(data, pos, size)
+        else:
+            end = size
+
+        if end < 0:
+            self.payload += size - pos
+            return size
+
+        end = pos + ((end - pos + 3) & ~3)
+        self.payload += end - pos
+
+        if kind == ARG_FORMAT and (self.args[self.entry[1]] >> self.entry[2]) & OPT_FORMAT:
+            words = 0
+            for match in FORMAT_SPEC.finditer(self.text):
+                if match.group(3) != b'%':
+                    words += 1 + (match.group(1) == b'*') + (match.group(2) == b'*')
+            if words:
+                self.kind = None
+                self.words = words
+                return end
+
+        self.next()
+        return end
+
+    def details(self):
+        """
+        Returns what is known so far about the payload of the current command as a dict:
+        the text of a string argument, the size and ratio of an inflated zlib stream or the format of an image,
+        'unchanged' once a complete command had only data the sink already knew.
+        """
+        details = None
+        if self.text is not None:
+            details = {"text": self.text.decode('utf-8', 'replace')}
+        elif self.compressed:
+            details = {"inflated": self.inflated, "ratio": round(self.inflated / self.compressed, 2)}
+        elif self.format is not None:
+            details = {"format": self.format}
+        if self.done and self.unchanged:
+            details = dict(details or (), unchanged=True)
+        return details
+
+    def state(self):
+        """
+        Returns the position in the command stream as a dict for a checkpoint,
+        None inside a zlib stream since the decompressor can not be stored.
+        """
+        if self.name is None:
+            return {"name": None}
+        if self.kind == ARG_ZLIB:
+            return None
+
+        state = {name: getattr(self, name) for name in self.STATE if hasattr(self, name)}
+        state["args"] = list(self.args)
+        for name in ("text", "head", "chunk"):
+            if state.get(name) is not None:
+                state[name] = pack_bytes(state[name])
+        return state
+
+    def restore(self, state):
+        """
+        Continues from the state of a checkpoint.
+        """
+        self.name = state["name"]
+        self.done = False
+        if self.name is None:
+            return
+
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.args = list(self.args)
+        if self.text is not None:
+            self.text = bytearray(unpack_bytes(self.text))
+        for name in ("head", "chunk"):
+            if name in state:
+                setattr(self, name, unpack_bytes(state[name]))
+        self.layout = self.arguments.get(self.name, ())
+        self.entry = self.layout[self.step - 1] if self.step else None
+
+    def deliver(self, data):
+        """
+        Passes payload data of the current command to the sink.
+        """
+        if data:
+            known = bool(self.sink(self.name, self.args, self.delivered, data))
+            self.unchanged = known if self.unchanged is None else self.unchanged and known
+            self.delivered += len(data)
+
+    def image(self, data, pos, size):
+        """
+        Scans for the end of a PNG or JPEG image, returns the position after the image or -1.
+        """
+        if self.format is None:
+            if data[pos] == 0x89:
+                self.format = 'png'
+                self.chunk = b''
+                self.skip = 8  # signature
+            elif data[pos] == 0xFF:
+                self.format = 'jpeg'
+            else:
+                return size  # unknown format, skip the rest of the burst
+
+        if self.format == 'jpeg':
+            # JPEG, search for the EOI marker
+            if self.skip and data[pos] == 0xD9:
+                return pos + 1
+            end = data.find(b'\xff\xd9', pos, size)
+            if end >= 0:
+                return end + 2
+            self.skip = data[size - 1] == 0xFF
+            return -1
+
+        # PNG, walk the chunks up to IEND
+        while pos < size:
+            if self.skip:
+                step = min(self.skip, size - pos)
+                pos += step
+                self.skip -= step
+                if not self.skip and self.chunk == b'IEND':
+                    return pos
+                continue
+            step = min(8 - len(self.head), size - pos)
+            self.head += bytes(data[pos:pos + step])
+            pos += step
+            if len(self.head) == 8:
+                self.skip = int.from_bytes(self.head[:4], 'big') + 4
+                self.chunk = self.head[4:]
+                self.head = b''
+        return -1
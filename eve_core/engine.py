@@ -0,0 +1,905 @@
+# Decoder for the SPI traffic of the EVE chips, shared by the extensions for the different chip families
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import struct
+
+from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame
+
+from .analysis import (AnomalyLog, BulkWriter, BusStatistics, DisplayList, FifoTracker, FrameProfiler, PollCollapser,
+                       RamShadow, WaitStates)
+from .copro import CoproParser
+from .export import NO_REGION, ColumnarExport
+from .filters import TransactionFilter
+from .memory import REGION_CMDB, REGION_NAMES, REGION_RAM_CMD, REGION_RAM_DL, REGION_RAM_G, REGION_ROM
+from .profile import HEADER_HOST, HEADER_INVALID, HEADER_NAMES, HEADER_READ, HEADER_WRITE
+
+
+# co-processor commands that write their payload to RAM_G at the address in the first argument
+RAM_G_WRITES = frozenset(("CMD_MEMWRITE", "CMD_INFLATE", "CMD_INFLATE2"))
+
+
+def join_frames(first, second):
+    """
+    Joins two results that can each be None, a frame or a list of frames.
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if not isinstance(first, list):
+        first = [first]
+    if not isinstance(second, list):
+        second = [second]
+    return first + second
+
+
+class Engine(HighLevelAnalyzer):
+    """
+    Decodes the enable/result/disable frames of the SPI analyzer, the extensions set the profile
+    for their chip and declare the settings 'mode', 'detail', 'filter', 'window', 'polling', 'writes', 'shadow' and 'export'.
+    """
+    profile = None
+
+    # frames carry the raw values, the text is only built by Logic for the frames it displays
+    result_types = {
+        'active': {'format': 'ACTIVE'},
+        'host': {'format': '{{data.command}}'},
+        'read': {'format': 'READ {{data.register}} = {{data.value}}'},
+        'write': {'format': 'WRITE {{data.register}} = {{data.value}}'},
+        'mem_read': {'format': 'READ {{data.region}}+{{data.offset}} = {{data.value}}'},
+        'mem_write': {'format': 'WRITE {{data.region}}+{{data.offset}} = {{data.value}}'},
+        'dl_write': {'format': 'WRITE {{data.region}}+{{data.offset}} = {{data.command}} {{data.param}}'},
+        'read_error': {'format': 'READ {{data.register}} = READ_ERROR'},
+        'boot_status': {'format': 'READ REG_BOOT_STATUS = {{data.status}}'},
+        'burst': {'format': 'WRITE {{data.register}}, {{data.length}} bytes'},
+        'copro': {'format': '{{data.command}}'},
+        'copro_text': {'format': '{{data.command}} "{{data.text}}"'},
+        'copro_inflate': {'format': '{{data.command}} {{data.payload}} bytes, inflated {{data.inflated}} ({{data.ratio}}:1)'},
+        'dl': {'format': '{{data.command}} {{data.param}}'},
+        'transaction': {'format': '{{data.direction}} {{data.address}}, {{data.length}} bytes'},
+        'statistics': {'format': 'SPI {{data.transactions}} transactions, {{data.bytes}} bytes, {{data.utilization}}%'},
+        'bandwidth': {'format': 'BUS {{data.utilization}}%, {{data.bytes}} bytes, {{data.polls}} polls'},
+        'poll': {'format': 'POLL {{data.register}} x{{data.count}} = {{data.first}} .. {{data.last}}'},
+        'fifo': {'format': 'FIFO {{data.occupancy}} bytes'},
+        'fifo_drain': {'format': 'FIFO {{data.occupancy}} bytes, {{data.boundary}} done after {{data.latency}} s'},
+        'render': {'format': 'FRAME {{data.duration}} s, {{data.bytes}} bytes, {{data.commands}} commands, p95 {{data.p95}} s'},
+        'render_stats': {'format': 'FRAMES {{data.count}}, p50 {{data.p50}} s, p95 {{data.p95}} s, p99 {{data.p99}} s'},
+        'bulk_write': {'format': 'BULK WRITE {{data.address}}..{{data.end}}, {{data.length}} bytes, {{data.throughput}} MB/s'},
+        'ram_g': {'format': 'RAM_G {{data.written}} bytes written, {{data.unchanged}} unchanged'},
+        'anomaly': {'format': 'ANOMALY {{data.anomaly}}, {{data.length}} bytes'},
+        'anomalies': {'format': 'ANOMALIES {{data.total}}'},
+        'wait_states': {'format': 'WAIT {{data.register}} {{data.mean}} bytes, max {{data.max}}, {{data.reads}} reads'},
+        'dl_commit': {'format': 'DL COMMIT {{data.count}} words, {{data.changed}} changed'},
+    }
+
+    def __init__(self):
+        profile = self.profile
+        # the hot paths use bound methods and attributes of the profile
+        self.header_length = profile.header_length
+        self.header_kinds = profile.header_kinds
+        self.address_mask = profile.address_mask
+        self.classify = profile.memory.classify
+        self.address = profile.address
+        self.read_value = profile.read_value
+        self.poll_addresses = profile.poll_addresses
+        self.read_wait = profile.read_wait if profile.wait_states else None
+
+        # the bytes of a transaction are collected in bytearrays, only the times needed for the frames are kept
+        self.mosi = bytearray()
+        self.miso = bytearray()
+        self.frame_start_time = None
+        self.frame_end_time = None
+        self.header_end_time = None
+        # the header of the current transaction, decoded once when it is complete
+        self.header_kind = HEADER_INVALID
+        self.header_addr = None
+        self.header_region = None
+        self.header_offset = None
+        self.sync_time = None
+        self.waiting = False
+        self.wait = None            # wait bytes and wait time of the current read
+        self.word_start_times = []
+        self.word_end_times = []
+        self.copro_write = False
+        self.word_times = False     # copro_write and the commands get their own frames
+        self.skip = False           # the transaction did not pass the filter
+        self.copro = CoproParser(profile.copro_commands, profile.copro_args, profile.file_option)
+        self.display_list = DisplayList(profile.ram_dl_size)
+        self.bus = BusStatistics(self.window / 1000) if self.mode == 'Bandwidth' else None
+        self.fifo = FifoTracker(profile.ram_cmd_size) if self.mode == 'FIFO' else None
+        self.frames = FrameProfiler() if self.mode == 'Frames' else None
+        self.polls = None if self.polling == 'Show every read' else PollCollapser(self.read_frame, profile.registers)
+        self.ram_g = RamShadow() if self.shadow == 'Shadow' else None
+        self.bulk = None if self.writes == 'Show every write' else BulkWriter(self.write_frame, self.ram_g)
+        self.anomalies = AnomalyLog()
+        self.wait_states = WaitStates() if profile.wait_states else None
+        if self.ram_g is not None:
+            self.copro.sink = self.copro_payload
+
+        path = self.export.strip() if isinstance(self.export, str) else ''
+        self.columns = ColumnarExport(path) if path else None
+
+        # the lighter decode levels replace decode() with a fast path that only does what they need
+        self.split_copro = self.detail != 'Registers'
+        self.length = 0
+        self.byte_count = 0
+        self.transaction_count = 0
+        self.busy = 0.0
+        self.window_start = None
+        self.window_length = None
+        self.selection = None
+        if self.bus is None and self.fifo is None and self.frames is None:
+            text = self.filter if isinstance(self.filter, str) else ''
+            if text.strip():
+                self.selection = TransactionFilter(text, profile)
+            if self.detail == 'Transactions only':
+                self.decode = self.decode_headers
+            elif self.detail == 'Statistics only':
+                self.window_length = self.window / 1000
+                self.decode = self.decode_statistics
+
+    def decode(self, frame: AnalyzerFrame):
+        if frame.type == 'result':
+            if self.skip:
+                return None
+
+            raw_mosi = frame.data.get('mosi')
+            raw_miso = frame.data.get('miso')
+
+            if (raw_mosi is None) or (raw_miso is None):
+                return None
+
+            mosi = self.mosi
+            mosi.append(raw_mosi[0])
+            self.miso.append(raw_miso[0])
+            self.frame_end_time = frame.end_time
+
+            header_length = self.header_length
+            if self.word_times:
+                # start and end times of the data words, for the frames of the co-processor commands
+                index = (len(mosi) - header_length - 1) & 3
+                if index == 0:
+                    self.word_start_times.append(frame.start_time)
+                elif index == 3:
+                    self.word_end_times.append(frame.end_time)
+            elif self.waiting:
+                # time of the sync byte that ends the wait states of a read
+                if raw_miso[0] == 0x01:
+                    self.sync_time = frame.start_time
+                    self.waiting = False
+            elif len(mosi) <= header_length:
+                if len(mosi) == 1 and self.frame_start_time is None:
+                    self.frame_start_time = frame.start_time
+                elif len(mosi) == header_length:
+                    self.header_end_time = frame.end_time
+                    self.decode_header(mosi)
+
+            return None
+
+        elif frame.type == 'enable':
+            self.begin_transaction(frame.start_time)
+            return None
+
+        elif frame.type == 'disable':
+            return self.end_transaction()
+
+    def begin_transaction(self, start_time):
+        """
+        Starts collecting a transaction.
+        """
+        self.mosi = bytearray()
+        self.miso = bytearray()
+        self.word_start_times = []
+        self.word_end_times = []
+        self.header_kind = HEADER_INVALID
+        self.copro_write = False
+        self.word_times = False
+        self.skip = False
+        self.sync_time = None
+        self.waiting = False
+        self.wait = None
+        self.frame_start_time = start_time
+
+    def end_transaction(self):
+        """
+        Returns the frames for the transaction collected since begin_transaction().
+        """
+        if self.skip:
+            return None
+
+        mosi_bytes = self.mosi
+        if self.selection is not None and self.profile.host_command(mosi_bytes) is not None:
+            return None  # host commands have no address, an ACTIVE on FT81x looks like a read of RAM_G
+        if self.columns is not None and mosi_bytes:
+            self.export_transaction(mosi_bytes)
+        if self.bus is not None:
+            return self.measure(mosi_bytes) if mosi_bytes else None
+        if self.fifo is not None:
+            return self.track_fifo(mosi_bytes) if len(mosi_bytes) > self.header_length else None
+        if self.frames is not None:
+            return self.profile_frame(mosi_bytes) if mosi_bytes else None
+
+        if self.wait_states is not None and len(mosi_bytes) > self.header_length and self.header_kind == HEADER_READ:
+            report = self.count_wait(mosi_bytes)
+            if report:
+                return join_frames(self.decode_runs(mosi_bytes), report)
+
+        return self.decode_runs(mosi_bytes)
+
+    def decode_runs(self, mosi_bytes):
+        """
+        Returns the frames for a transaction in 'Decode' mode, with the runs of polls and writes collapsed.
+        """
+        polls = self.polls
+        bulk = self.bulk
+        if polls is None and bulk is None:
+            return self.decode_transaction(mosi_bytes)
+
+        if polls is not None:
+            addr = self.poll_address(mosi_bytes)
+            value = self.read_value(self.miso) if addr is not None else None
+            if value is not None:
+                pending = bulk.flush() if bulk is not None else None
+                wait = self.wait[0] if self.wait is not None else None
+                return join_frames(pending, polls.add(addr, value, self.frame_start_time, self.frame_end_time, wait))
+
+        if bulk is not None:
+            addr = self.bulk_address(mosi_bytes)
+            if addr is not None:
+                pending = polls.flush() if polls is not None else None
+                return join_frames(pending, self.add_bulk(addr, mosi_bytes))
+
+        # any other transaction ends the runs before it
+        pending = join_frames(polls.flush() if polls is not None else None, bulk.flush() if bulk is not None else None)
+        return join_frames(pending, self.decode_transaction(mosi_bytes))
+
+    def decode_headers(self, frame: AnalyzerFrame):
+        """
+        Fast path for 'Transactions only', keeps the header bytes and one more to tell host commands apart
+        and shows one frame per transaction with the direction, the address and the length.
+        """
+        if frame.type == 'result':
+            self.length += 1
+            self.frame_end_time = frame.end_time
+            if self.length <= self.header_length + 1:
+                raw_mosi = frame.data.get('mosi')
+                if raw_mosi is not None:
+                    self.mosi.append(raw_mosi[0])
+            return None
+
+        elif frame.type == 'enable':
+            self.mosi = bytearray()
+            self.length = 0
+            self.frame_start_time = frame.start_time
+            return None
+
+        elif frame.type == 'disable':
+            mosi = self.mosi
+            if not mosi:
+                return None
+
+            kind = self.header_kinds[mosi[0]]
+            has_header = len(mosi) >= self.header_length
+            selection = self.selection
+            if selection is not None:
+                # the same rule as decode_header(), host commands and transactions without an address never pass
+                if kind == HEADER_HOST or not has_header:
+                    return None
+                if len(mosi) == self.length and self.profile.host_command(mosi) is not None:
+                    return None
+                addr = self.address(mosi)
+                region = self.classify(addr)[0]
+                if not selection.match(addr, kind == HEADER_WRITE and (region == REGION_CMDB or region == REGION_RAM_CMD)):
+                    return None
+
+            data = {"direction": HEADER_NAMES[kind], "length": self.length}
+            if has_header:
+                data["address"] = self.address(mosi)
+            return AnalyzerFrame('transaction', self.frame_start_time, self.frame_end_time, data)
+
+    def decode_statistics(self, frame: AnalyzerFrame):
+        """
+        Fast path for 'Statistics only', counts the bytes and the transactions without looking at them
+        and shows one frame per window.
+        """
+        if frame.type == 'result':
+            self.byte_count += 1
+            return None
+
+        elif frame.type == 'enable':
+            self.frame_start_time = frame.start_time
+            if self.window_start is None:
+                self.window_start = frame.start_time
+            return None
+
+        elif frame.type == 'disable':
+            end_time = frame.end_time
+            self.frame_end_time = end_time
+            self.transaction_count += 1
+            self.busy += float(end_time - self.frame_start_time)
+            if float(end_time - self.window_start) >= self.window_length:
+                return self.statistics(end_time)
+            return None
+
+    def statistics(self, end_time):
+        """
+        Returns the frame for the window that ends at end_time and starts the next one, None if the window is empty.
+        """
+        if not self.transaction_count:
+            return None
+
+        start_time = self.window_start
+        duration = float(end_time - start_time)
+        frame = AnalyzerFrame('statistics', start_time, end_time, {
+            "transactions": self.transaction_count,
+            "bytes": self.byte_count,
+            "busy": self.busy,
+            "utilization": round(100 * self.busy / duration, 1) if duration else 100.0,
+            "throughput": round(self.byte_count / duration / 1e6, 3) if duration else 0.0
+        })
+
+        self.transaction_count = 0
+        self.byte_count = 0
+        self.busy = 0.0
+        self.window_start = end_time
+        return frame
+
+    def export_transaction(self, mosi):
+        """
+        Adds the transaction as a row to the columnar export.
+        """
+        profile = self.profile
+        header_length = self.header_length
+        start_time = self.frame_start_time
+        end_time = self.frame_end_time
+
+        host = profile.host_command(mosi)
+        if host is not None:
+            self.columns.add(start_time, end_time, HEADER_HOST, 0, NO_REGION, -1, host[1], 0)
+            return
+        if len(mosi) < header_length:
+            self.columns.add(start_time, end_time, HEADER_INVALID, 0, NO_REGION, -1, -1, 0)
+            return
+
+        kind = self.header_kind
+        value = None
+        command = -1
+        if kind == HEADER_READ:
+            value = self.read_value(self.miso)
+        elif kind == HEADER_WRITE:
+            value = profile.write_value(mosi)
+            if self.copro_write and len(mosi) >= header_length + 4:
+                command = value
+        self.columns.add(start_time, end_time, kind, self.header_addr, self.header_region,
+                         -1 if value is None else value, command, len(mosi) - header_length)
+
+    def decode_header(self, mosi):
+        """
+        Decodes the complete address header in MOSI once for everything that looks at the transaction later.
+        """
+        kind = self.header_kinds[mosi[0]]
+        # the byte order as a keyword argument costs more than the lookup of the kind, see tools/header_benchmark.py
+        addr = int.from_bytes(mosi, 'big') & self.address_mask
+        region, offset = self.classify(addr)
+        self.header_kind = kind
+        self.header_addr = addr
+        self.header_region = region
+        self.header_offset = offset
+
+        self.copro_write = kind == HEADER_WRITE and (region == REGION_CMDB or region == REGION_RAM_CMD)
+        self.word_times = self.copro_write and self.split_copro
+        self.waiting = self.wait_states is not None and kind == HEADER_READ
+        if self.selection is not None and (kind == HEADER_HOST or not self.selection.match(addr, self.copro_write)):
+            # the rest of the transaction is neither buffered nor decoded
+            self.skip = True
+            self.copro_write = self.word_times = self.waiting = False
+
+    def poll_address(self, mosi):
+        """
+        Returns the address if the transaction reads a polling register, otherwise None.
+        """
+        if len(mosi) <= self.header_length + 1 or self.header_kind != HEADER_READ:
+            return None
+
+        addr = self.header_addr
+        return addr if addr in self.poll_addresses else None
+
+    def count_wait(self, mosi):
+        """
+        Adds the wait bytes of a read to the histogram of its register or region,
+        keeps them with the wait time for the frame of the read.
+        Returns the histogram frames once per summary window, otherwise None.
+        """
+        wait = self.read_wait(self.miso)
+        if wait is None:
+            return None
+
+        target = self.profile.registers.get(self.header_addr)
+        if target is None:
+            target = REGION_NAMES[self.header_region]
+
+        sync_time = self.sync_time
+        duration = float(sync_time - self.header_end_time) if sync_time is not None and wait else 0.0
+        self.wait_states.add(target, wait, duration)
+        self.wait = (wait, duration)
+        return self.wait_states.report(self.frame_end_time, self.window / 1000)
+
+    def bulk_address(self, mosi):
+        """
+        Returns the address if the transaction writes data to RAM_G, otherwise None.
+        """
+        if len(mosi) <= self.header_length or self.header_kind != HEADER_WRITE or self.header_region != REGION_RAM_G:
+            return None
+
+        return self.header_addr
+
+    def add_bulk(self, addr, mosi):
+        """
+        Adds a write to RAM_G to the bulk writer, returns the frame of a run that is complete or None.
+        """
+        offset = self.header_offset
+        data = mosi[self.header_length:]
+        # the run before ends with the counters of the shadow before this write
+        pending = self.bulk.flush() if not self.bulk.continues(addr) else None
+        unchanged = self.ram_g.write(offset, data) if self.ram_g is not None else False
+        return join_frames(pending, self.bulk.add(addr, offset, data, unchanged, self.frame_start_time, self.frame_end_time))
+
+    def decode_transaction(self, mosi_bytes):
+        """
+        Returns the frames for the transaction in self.mosi and self.miso.
+        """
+        profile = self.profile
+        header_length = self.header_length
+        start_time = self.frame_start_time
+        end_time = self.frame_end_time
+
+        host = profile.host_command(mosi_bytes)
+        if host is not None:
+            kind, cmd = host
+            if kind == 'active':
+                return AnalyzerFrame('active', start_time, end_time, {})
+            return AnalyzerFrame('host', start_time, end_time, {
+                "command": profile.commands.get(cmd, "UNKNOWN_CMD"),
+                "code": cmd
+            })
+
+        if len(mosi_bytes) < header_length or (len(mosi_bytes) == header_length and self.header_kind != HEADER_READ):
+            if not mosi_bytes:
+                return None
+            return self.anomaly('truncated', start_time, end_time, {"length": len(mosi_bytes)})
+
+        kind = self.header_kind
+        addr = self.header_addr
+        region = self.header_region
+        offset = self.header_offset
+        register = profile.registers.get(addr)
+
+        if kind != HEADER_WRITE and kind != HEADER_READ:
+            # a host command byte without the length of a host command or a byte no header starts with
+            return self.anomaly('invalid', start_time, end_time, {
+                "header": HEADER_NAMES[kind],
+                "length": len(mosi_bytes)
+            })
+
+        if kind == HEADER_WRITE:
+            if self.copro_write and len(mosi_bytes) >= header_length + 4:
+                if self.split_copro:
+                    frames = self.decode_copro(addr, region, start_time)
+                else:
+                    frames = [AnalyzerFrame('burst', start_time, end_time, {
+                        "register": REGION_NAMES[region],
+                        "address": addr,
+                        "length": len(mosi_bytes) - header_length
+                    })]
+                if frames and (len(mosi_bytes) - header_length) & 3:
+                    self.flag(frames[0], 'unaligned')
+                return frames or None
+
+            # WRITE Frame
+            value = profile.write_value(mosi_bytes)
+            read_only = region == REGION_ROM or addr in profile.read_only_addresses
+
+            if region == REGION_RAM_DL:
+                self.display_list.write(offset, mosi_bytes[header_length:])
+
+            if addr == profile.dlswap_addr and value:
+                data = self.display_list.commit()
+                data["register"] = register
+                data["value"] = value
+                return AnalyzerFrame('dl_commit', start_time, end_time, data)
+
+            if region == REGION_RAM_DL and len(mosi_bytes) >= header_length + 4:
+                command = profile.copro_commands.get(value)
+                param = 0
+                if command is None:
+                    command, param = profile.decode_dl_command(value)
+
+                return AnalyzerFrame('dl_write', start_time, end_time, {
+                    "region": REGION_NAMES[region],
+                    "offset": offset,
+                    "address": addr,
+                    "value": value,
+                    "command": command or "UNKNOWN",
+                    "param": param
+                })
+
+            if register:
+                frame = AnalyzerFrame('write', start_time, end_time, {
+                    "register": register,
+                    "address": addr,
+                    "value": value
+                })
+            else:
+                unchanged = False
+                if region == REGION_RAM_G and self.ram_g is not None:
+                    unchanged = self.ram_g.write(offset, mosi_bytes[header_length:])
+                frame = self.write_frame(addr, value, unchanged, start_time, end_time)
+
+            if read_only:
+                self.flag(frame, 'read_only')
+            elif self.copro_write:
+                self.flag(frame, 'unaligned')  # less than a word for the co-processor
+            return frame
+
+        else:
+            # READ Frame
+            if len(mosi_bytes) < profile.read_min_length:
+                # Need at least dummy + 1 return byte
+                return self.anomaly('short_read', start_time, end_time, {
+                    "address": addr,
+                    "length": len(mosi_bytes)
+                })
+
+            value = profile.read_value(self.miso)
+            frame = self.read_frame(addr, value, start_time, end_time)
+            if value is None:
+                no_sync = self.read_wait is not None and self.read_wait(self.miso) is None
+                self.flag(frame, 'no_sync' if no_sync else 'short_read')
+            if self.wait is not None:
+                frame.data["wait"], frame.data["wait_time"] = self.wait
+            if region == REGION_RAM_G and self.ram_g is not None and value is not None:
+                data_bytes = profile.read_data(self.miso)
+                expected = self.ram_g.read(offset, len(data_bytes))
+                if expected is not None and expected != data_bytes:
+                    frame.data["expected"] = int.from_bytes(expected, byteorder='little')
+            return frame
+
+    def anomaly(self, kind, start_time, end_time, data):
+        """
+        Returns the frame for a transaction that is too malformed to decode.
+        """
+        data["anomaly"] = kind
+        data["anomaly_count"] = self.anomalies.add(kind)
+        return AnalyzerFrame('anomaly', start_time, end_time, data)
+
+    def flag(self, frame, kind):
+        """
+        Marks the frame of a transaction that could be decoded but is not what the chip expects.
+        """
+        frame.data["anomaly"] = kind
+        frame.data["anomaly_count"] = self.anomalies.add(kind)
+
+    def write_frame(self, addr, value, unchanged, start_time, end_time):
+        """
+        Returns the frame for a write to memory, unchanged is True if the shadow of RAM_G already had the data.
+        """
+        region, offset = self.profile.memory.classify(addr)
+        frame = AnalyzerFrame('mem_write', start_time, end_time, {
+            "region": REGION_NAMES[region],
+            "offset": offset,
+            "address": addr,
+            "value": value
+        })
+        if unchanged:
+            frame.data["unchanged"] = True
+        if region == REGION_RAM_G and self.ram_g is not None:
+            frame.data.update(self.ram_g.counters())
+        return frame
+
+    def read_frame(self, addr, value, start_time, end_time):
+        """
+        Returns the frame for a read, value is None for reads without a valid response.
+        """
+        profile = self.profile
+        region, offset = profile.memory.classify(addr)
+        register = profile.registers.get(addr)
+
+        if value is None:
+            return AnalyzerFrame('read_error', start_time, end_time, {
+                "register": register or REGION_NAMES[region],
+                "address": addr
+            })
+
+        if addr == profile.boot_status_addr:
+            return AnalyzerFrame('boot_status', start_time, end_time, {
+                "register": register,
+                "address": addr,
+                "value": value,
+                "status": profile.boot_status.get(value, "unknown")
+            })
+
+        if register:
+            return AnalyzerFrame('read', start_time, end_time, {
+                "register": register,
+                "address": addr,
+                "value": value
+            })
+
+        return AnalyzerFrame('mem_read', start_time, end_time, {
+            "region": REGION_NAMES[region],
+            "offset": offset,
+            "address": addr,
+            "value": value
+        })
+
+    def measure(self, mosi):
+        """
+        Adds the transaction to the bus statistics, returns the summary frame when a window is complete.
+        """
+        region = None
+        poll = False
+        if len(mosi) >= self.header_length and self.profile.host_command(mosi) is None:
+            region = self.header_region
+            poll = self.header_kind == HEADER_READ and self.header_addr in self.poll_addresses
+
+        return self.bus.add(region, len(mosi), poll, self.frame_start_time, self.frame_end_time)
+
+    def track_fifo(self, mosi):
+        """
+        Feeds the transaction to the model of the command FIFO, returns a frame when the occupancy changed.
+        """
+        profile = self.profile
+        fifo = self.fifo
+        if profile.host_command(mosi) is not None:
+            return None
+
+        addr = self.header_addr
+        if self.header_kind == HEADER_WRITE:
+            if self.copro_write:
+                region = self.header_region
+                offset = self.header_offset
+                boundaries = []
+                for _, last, name, _, _, _, flags, _ in self.copro.feed(mosi, self.header_length):
+                    if name in FifoTracker.BOUNDARIES and not flags & CoproParser.CONTINUES:
+                        boundaries.append((name, (last + 1) * 4))
+                fifo.queue(None if region == REGION_CMDB else offset, len(mosi) - self.header_length, boundaries,
+                           self.frame_end_time)
+            elif addr == profile.cmd_write_addr:
+                value = profile.write_value(mosi)
+                if value is not None:
+                    fifo.set_write(value)
+        elif self.header_kind != HEADER_READ:
+            pass
+        elif addr == profile.cmd_read_addr or addr == profile.cmd_write_addr or addr == profile.cmdb_space_addr:
+            value = self.read_value(self.miso)
+            if value is not None:
+                if addr == profile.cmd_read_addr:
+                    fifo.set_read(value)
+                elif addr == profile.cmd_write_addr:
+                    fifo.set_write(value)
+                else:
+                    fifo.set_space(value)
+
+        return fifo.update(self.frame_start_time, self.frame_end_time)
+
+    def profile_frame(self, mosi):
+        """
+        Adds the transaction to the current rendered frame, returns the summary frame when it ends the frame.
+        """
+        profile = self.profile
+        frames = self.frames
+        header_length = self.header_length
+        result = None
+
+        if len(mosi) <= header_length or profile.host_command(mosi) is not None:
+            frames.add(len(mosi), False, self.frame_start_time, self.frame_end_time)
+            return None
+
+        addr = self.header_addr
+        frames.add(len(mosi), self.header_kind == HEADER_READ and addr in self.poll_addresses,
+                   self.frame_start_time, self.frame_end_time)
+
+        if self.header_kind != HEADER_WRITE:
+            return None
+
+        if self.copro_write:
+            # commands after a CMD_SWAP already count for the next frame
+            for _, _, name, _, _, payload, flags, _ in self.copro.feed(mosi, header_length):
+                if name is None:
+                    continue
+                if not flags & CoproParser.CONTINUED:
+                    frames.command(name)
+                if payload and not flags & CoproParser.CONTINUES:
+                    frames.payload(name, payload)
+                if name == "CMD_SWAP" and not flags & CoproParser.CONTINUES and result is None:
+                    result = frames.boundary()
+        elif addr == profile.dlswap_addr and profile.write_value(mosi):
+            result = frames.boundary()
+
+        return result
+
+    def copro_payload(self, name, args, offset, data):
+        """
+        Sink for the payload data of the co-processor commands, copies what goes to RAM_G into the shadow,
+        returns True if the shadow already had the data.
+        """
+        if name in RAM_G_WRITES:
+            return self.ram_g.write(args[0] + offset, data, offset > 0)
+        return False
+
+    def finish(self):
+        """
+        Returns the frames still pending at the end of a capture, Logic 2 has no callback for it,
+        tools/replay.py calls this after the last frame.
+        """
+        if self.window_length is not None:
+            frames = [self.statistics(self.frame_end_time)]
+        elif self.decode == self.decode_headers:
+            frames = []
+        elif self.bus is not None:
+            frames = [self.bus.summary()]
+        elif self.frames is not None:
+            frames = [self.frames.summary()]
+        else:
+            frames = [self.polls.flush() if self.polls is not None else None,
+                      self.bulk.flush() if self.bulk is not None else None,
+                      self.anomalies.summary(self.frame_end_time)]
+            if self.wait_states is not None:
+                frames.extend(self.wait_states.summary(self.frame_end_time))
+        if self.ram_g is not None:
+            frames.append(self.ram_g.summary(self.frame_end_time))
+        if self.columns is not None:
+            self.columns.close()
+        return [frame for frame in frames if frame is not None]
+
+    def skim(self, start_time, mosi, miso, end_time, byte_time):
+        """
+        Takes a whole transaction into the state like decode() does with its frames but without the frames,
+        a pass that only follows the state is several times faster than the decode.
+        byte_time(position) returns the start and end time of a byte, it is only asked for the times the
+        state depends on.
+        """
+        decode = self.decode
+        if decode == self.decode_headers:
+            return  # the transactions do not depend on each other
+        if decode == self.decode_statistics:
+            decode(AnalyzerFrame('enable', start_time, start_time, {}))
+            self.byte_count += len(mosi)
+            decode(AnalyzerFrame('disable', end_time, end_time, {}))
+            return
+
+        self.begin_transaction(start_time)
+        header_length = self.header_length
+        length = len(mosi)
+        if length >= header_length:
+            self.header_end_time = self.frame_end_time = byte_time(header_length - 1)[1]
+            self.decode_header(bytearray(mosi[:header_length]))
+            if self.skip:
+                return  # decode() stops collecting after the header
+        elif not length:
+            self.end_transaction()
+            return
+
+        self.mosi = bytearray(mosi)
+        self.miso = bytearray(miso)
+        self.frame_end_time = byte_time(length - 1)[1]
+        if self.word_times:
+            self.word_start_times = [byte_time(position)[0] for position in range(header_length, length, 4)]
+            self.word_end_times = [byte_time(position)[1] for position in range(header_length + 3, length, 4)]
+        elif self.waiting:
+            position = miso.find(0x01, header_length)
+            if position >= 0:
+                self.sync_time = byte_time(position)[0]
+                self.waiting = False
+        self.end_transaction()
+
+    # parts of the decoder that carry state from one transaction to the next
+    STATE_PARTS = ("display_list", "anomalies", "bus", "fifo", "polls", "bulk", "wait_states", "ram_g")
+
+    def state(self):
+        """
+        Returns the decoder state between two transactions as a dict of plain values for a checkpoint,
+        or None while the co-processor parser is inside a zlib stream, the next transaction can be tried instead.
+        """
+        if self.frames is not None:
+            raise ValueError("the 'Frames' mode keeps the time of every frame and has no checkpoints")
+
+        copro = self.copro.state()
+        if copro is None:
+            return None
+
+        state = {"copro": copro}
+        for name in self.STATE_PARTS:
+            part = getattr(self, name)
+            if part is not None:
+                state[name] = part.state()
+        if self.window_length is not None:
+            state["statistics"] = [self.transaction_count, self.byte_count, self.busy, self.window_start]
+        return state
+
+    def restore(self, state):
+        """
+        Continues from a state returned by state(), taken with the same settings.
+        """
+        self.copro.restore(state["copro"])
+        for name in self.STATE_PARTS:
+            part = getattr(self, name)
+            if part is not None:
+                part.restore(state[name])
+        if self.window_length is not None:
+            self.transaction_count, self.byte_count, self.busy, self.window_start = state["statistics"]
+
+    def decode_copro(self, addr, region, start_time):
+        """
+        Splits a write to REG_CMDB_WRITE or RAM_CMD into one frame for the address
+        and one frame per co-processor command with the times of its words.
+        """
+        header_length = self.header_length
+        frames = [AnalyzerFrame('burst', start_time, self.header_end_time, {
+            "register": REGION_NAMES[region],
+            "address": addr,
+            "length": len(self.mosi) - header_length
+        })]
+
+        word_start_times = self.word_start_times
+        word_end_times = self.word_end_times
+        for first, last, name, opcode, args, payload, flags, details in self.copro.feed(self.mosi, header_length):
+            if name is None:
+                command, param = self.profile.decode_dl_command(opcode)
+                frames.append(AnalyzerFrame('dl', word_start_times[first], word_end_times[last], {
+                    "command": command or "UNKNOWN",
+                    "param": param,
+                    "value": opcode
+                }))
+                continue
+
+            data = {"command": name, "opcode": opcode}
+            if args:
+                data["args"] = struct.pack('<%dI' % len(args), *args)
+            if payload:
+                data["payload"] = payload
+            if flags & CoproParser.CONTINUED:
+                data["continued"] = True
+            if flags & CoproParser.CONTINUES:
+                data["incomplete"] = True
+
+            if name in RAM_G_WRITES and self.ram_g is not None and not flags & CoproParser.CONTINUES:
+                data.update(self.ram_g.counters())  # after the burst
+
+            frame_type = 'copro'
+            if details is not None:
+                data.update(details)
+                if "text" in details:
+                    frame_type = 'copro_text'
+                elif "inflated" in details:
+                    frame_type = 'copro_inflate'
+
+            frames.append(AnalyzerFrame(frame_type, word_start_times[first], word_end_times[last], data))
+
+        commands = self.selection.commands if self.selection is not None else None
+        if commands is not None:
+            return [frame for frame in frames[1:] if frame.data["command"] in commands]
+        return frames
@@ -0,0 +1,162 @@
+# Columnar export of the transactions seen by the EVE decoders
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import sys
+from array import array
+
+from .memory import REGION_NAMES
+from .profile import HEADER_NAMES
+
+# name, array typecode, dtype for numpy and other readers of the raw little-endian column files
+COLUMNS = (
+    ("start_time", "d", "<f8"),  # seconds since the start of the first transaction exported
+    ("end_time", "d", "<f8"),
+    ("direction", "B", "|u1"),   # HEADER_* class, HEADER_HOST for host commands
+    ("address", "I", "<u4"),
+    ("region", "B", "|u1"),      # REGION_*, 255 for host commands
+    ("value", "q", "<i8"),       # first up to 4 data bytes, -1 if there are none
+    ("command", "q", "<i8"),     # host command code or first co-processor command word, -1 otherwise
+    ("length", "I", "<u4"),      # bytes after the header
+)
+
+NO_REGION = 255
+
+
+class ColumnarExport:
+    """
+    Writes one row per transaction into one raw file per column in a directory, with schema.json describing
+    the columns, so the export loads with numpy.fromfile() or numpy.memmap() instead of parsing text.
+    The rows are kept in typed arrays and appended to the files every chunk rows or every interval seconds
+    of capture time, Logic 2 does not tell an analyzer that the capture ended, close() writes the rest.
+    Times are stored relative to the first transaction, the absolute times of Logic 2 can not be converted to float.
+    """
+    def __init__(self, directory, chunk=16384, interval=1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk = chunk
+        self.interval = interval
+        self.rows = 0
+        self.pending = 0
+        self.first_time = None     # start of the first transaction, as given by the caller
+        self.flush_time = 0.0      # relative time of the last flush
+        self.columns = [array(typecode) for _, typecode, _ in COLUMNS]
+        self.appenders = [column.append for column in self.columns]
+        # the files are started empty, an export always describes one run
+        for name, _, _ in COLUMNS:
+            open(self.path(name), "wb").close()
+
+    def path(self, name):
+        return os.path.join(self.directory, name + ".bin")
+
+    def add(self, start_time, end_time, direction, address, region, value, command, length):
+        """
+        Adds a row, writes the pending rows when a chunk is complete or the interval has passed.
+        """
+        (append_start, append_end, append_direction, append_address, append_region, append_value,
+         append_command, append_length) = self.appenders
+        first_time = self.first_time
+        if first_time is None:
+            first_time = self.first_time = start_time
+        end = float(end_time - first_time)
+        append_start(float(start_time - first_time))
+        append_end(end)
+        append_direction(direction)
+        append_address(address)
+        append_region(region)
+        append_value(value)
+        append_command(command)
+        append_length(length)
+        self.pending += 1
+        if self.pending >= self.chunk or end - self.flush_time >= self.interval:
+            self.flush_time = end
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the pending rows to the column files and updates the schema.
+        """
+        if self.pending:
+            for (name, _, _), column in zip(COLUMNS, self.columns):
+                if sys.byteorder == "big":
+                    column.byteswap()
+                with open(self.path(name), "ab") as file:
+                    column.tofile(file)
+                del column[:]
+            self.rows += self.pending
+            self.pending = 0
+        self.write_schema()
+
+    def write_schema(self):
+        """
+        Replaces schema.json, readers see either the old or the new row count, never a partial file.
+        """
+        try:
+            first_time = float(self.first_time) if self.first_time is not None else None
+        except TypeError:
+            first_time = None  # absolute time of Logic 2
+        schema = {
+            "rows": self.rows,
+            "first_time": first_time,
+            "columns": [{"name": name, "dtype": dtype, "file": name + ".bin"} for name, _, dtype in COLUMNS],
+            "direction": list(HEADER_NAMES),
+            "region": list(REGION_NAMES),
+            "no_region": NO_REGION,
+        }
+        path = os.path.join(self.directory, "schema.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump(schema, file, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        self.flush()
+
+    def __del__(self):
+        # Logic 2 drops the analyzer when it is run again or removed, the last rows are written then
+        try:
+            if self.pending:
+                self.flush()
+        except Exception:
+            pass
+
+
+def read_columns(directory):
+    """
+    Reads an export back into a dict of arrays, for tools that do without numpy.
+    """
+    with open(os.path.join(directory, "schema.json")) as file:
+        schema = json.load(file)
+
+    result = {}
+    for name, typecode, _ in COLUMNS:
+        column = array(typecode)
+        with open(os.path.join(directory, name + ".bin"), "rb") as file:
+            column.frombytes(file.read())
+        if sys.byteorder == "big":
+            column.byteswap()
+        result[name] = column[:schema["rows"]]
+    return result
@@ -0,0 +1,85 @@
+# Filter for the transactions the EVE decoders show
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from bisect import bisect_right
+from fnmatch import fnmatchcase
+
+from .memory import REGION_NAMES
+
+
+class TransactionFilter:
+    """
+    Filter from a comma or space separated list of register names, memory regions, addresses, address ranges
+    like 0x1000-0x1FFF and co-processor or display list command names, names can have * and ? wildcards.
+    Writes to REG_CMDB_WRITE or RAM_CMD pass when commands are given, only the matching commands are shown.
+    Host commands have no address and never pass.
+    """
+    def __init__(self, text, profile):
+        addresses = set()
+        ranges = []
+        commands = set()
+        names = list(profile.copro_commands.values()) + list(profile.dl_commands.values()) + ["DL_VERTEX2F", "DL_VERTEX2II"]
+
+        for token in text.replace(',', ' ').split():
+            name = token.upper()
+            if token[0].isdigit():
+                first, _, last = token.partition('-')
+                try:
+                    ranges.append((int(first, 0), int(last or first, 0)))
+                except ValueError:
+                    raise ValueError(f"filter: invalid address '{token}'") from None
+            elif name in REGION_NAMES:
+                ranges.extend(profile.memory.ranges(REGION_NAMES.index(name)))
+            else:
+                registers = [addr for addr, register in profile.registers.items() if fnmatchcase(register, name)]
+                matches = [command for command in names if fnmatchcase(command, name)]
+                if not registers and not matches:
+                    raise ValueError(f"filter: unknown register, region or command '{token}'")
+                addresses.update(registers)
+                commands.update(matches)
+
+        # overlapping ranges are merged so one bisect finds the only candidate
+        merged = []
+        for first, last in sorted(ranges):
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+
+        self.addresses = frozenset(addresses)
+        self.starts = [first for first, _ in merged]
+        self.ends = [last for _, last in merged]
+        self.commands = frozenset(commands) or None
+
+    def match(self, addr, copro_write):
+        """
+        Checks if a transaction with the address from its header passes the filter.
+        """
+        if addr in self.addresses or (copro_write and self.commands is not None):
+            return True
+
+        index = bisect_right(self.starts, addr) - 1
+        return index >= 0 and addr <= self.ends[index]
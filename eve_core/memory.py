@@ -0,0 +1,85 @@
+# Memory regions of the EVE chips and address classification
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from bisect import bisect_right
+
+# memory regions
+REGION_NONE = 0
+REGION_RAM_G = 1
+REGION_ROM = 2
+REGION_RAM_DL = 3
+REGION_REG = 4
+REGION_RAM_CMD = 5
+REGION_CMDB = 6
+
+REGION_NAMES = ("UNMAPPED", "RAM_G", "ROM", "RAM-DL", "REG", "RAM_CMD", "REG_CMDB_WRITE")
+
+
+def build_memory_index(memory_map):
+    """
+    Flattens the memory map into sorted start addresses and (region, region start) entries for bisect.
+    """
+    bounds = sorted({0} | {first for first, _, _ in memory_map} | {last + 1 for _, last, _ in memory_map})
+    starts = []
+    entries = []
+
+    for start in bounds:
+        entry = (REGION_NONE, start)
+        for first, last, region in memory_map:
+            if first <= start <= last:
+                entry = (region, first)
+        if entries and entries[-1] == entry:
+            continue
+        starts.append(start)
+        entries.append(entry)
+
+    return starts, entries
+
+
+class MemoryMap:
+    """
+    Memory map as (first address, last address, region) tuples, later entries take precedence over earlier ones.
+    """
+    def __init__(self, memory_map):
+        self.starts, self.entries = build_memory_index(memory_map)
+
+    def classify(self, addr):
+        """
+        Returns (region, offset into the region) for an address.
+        """
+        region, first = self.entries[bisect_right(self.starts, addr) - 1]
+        return region, addr - first
+
+    def ranges(self, region):
+        """
+        Returns the (first address, last address) ranges of a region.
+        """
+        starts = self.starts
+        result = []
+        for index, (entry_region, _) in enumerate(self.entries):
+            if entry_region == region and index + 1 < len(starts):
+                result.append((starts[index], starts[index + 1] - 1))
+        return result
@@ -0,0 +1,223 @@
+# Chip profiles for the EVE decoders, the SPI protocol and the tables of a chip family
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from .memory import REGION_RAM_CMD, MemoryMap
+
+# registers that are read in loops while waiting for the co-processor or for the boot to complete
+POLL_REGISTERS = ("REG_CMD_READ", "REG_CMD_WRITE", "REG_CMDB_SPACE", "REG_BOOT_STATUS")
+
+# classes of the first byte of a transaction, from the 256-entry table of a profile
+HEADER_READ = 0
+HEADER_WRITE = 1
+HEADER_HOST = 2      # host command if the transaction has the length of one
+HEADER_INVALID = 3
+
+HEADER_NAMES = ("READ", "WRITE", "HOST", "INVALID")
+
+# registers the host can only read, a write to one of them is reported as an anomaly
+READ_ONLY_REGISTERS = ("REG_ID", "REG_CHIP_ID", "REG_FRAMES", "REG_CLOCK", "REG_TRACKER", "REG_TRACKER_1",
+                       "REG_TRACKER_2", "REG_TRACKER_3", "REG_TRACKER_4", "REG_TOUCH_RAW_XY", "REG_TOUCH_SCREEN_XY",
+                       "REG_TOUCH_TAG_XY", "REG_TOUCH_TAG", "REG_CTOUCH_TOUCHB_XY", "REG_CTOUCH_TOUCHC_XY",
+                       "REG_CTOUCH_TOUCH4_XY")
+
+
+class Profile:
+    """
+    Base for the chip profiles, the subclasses know the layout of the SPI transactions,
+    the tables come from the extension for the chip.
+    """
+    header_length = 3         # bytes of the command or address header
+    address_mask = 0x3FFFFF
+    read_min_length = 0       # shorter reads are reported as anomalies
+    wait_states = False       # reads return a variable number of wait bytes before the data
+
+    def __init__(self, commands, registers, dl_commands, copro_commands, copro_args, memory_map, ram_dl_size,
+                 file_option=0, boot_status=None):
+        self.commands = commands
+        self.registers = registers
+        self.dl_commands = dl_commands
+        self.copro_commands = copro_commands
+        self.copro_args = copro_args
+        self.memory = MemoryMap(memory_map)
+        self.ram_cmd_size = next(last - first + 1 for first, last, region in memory_map if region == REGION_RAM_CMD)
+        self.ram_dl_size = ram_dl_size
+        self.file_option = file_option
+        self.boot_status = boot_status
+
+        # the first byte of a transaction is classified with one lookup
+        self.header_kinds = bytes(self.header_kind(byte) for byte in range(256))
+
+        self.addresses = addresses = {name: addr for addr, name in registers.items()}
+        self.dlswap_addr = addresses.get("REG_DLSWAP")
+        self.cmd_read_addr = addresses.get("REG_CMD_READ")
+        self.cmd_write_addr = addresses.get("REG_CMD_WRITE")
+        self.cmdb_space_addr = addresses.get("REG_CMDB_SPACE")
+        self.boot_status_addr = addresses.get("REG_BOOT_STATUS") if boot_status else None
+        self.poll_addresses = frozenset(addresses[name] for name in POLL_REGISTERS if name in addresses)
+        self.read_only_addresses = frozenset(addresses[name] for name in READ_ONLY_REGISTERS if name in addresses)
+
+    def header_kind(self, byte):
+        """
+        Returns the HEADER_* class for the first byte of a transaction, used to build the lookup table.
+        """
+        raise NotImplementedError
+
+    def address(self, mosi):
+        """
+        Returns the address from the header in MOSI.
+        """
+        return int.from_bytes(mosi[0:self.header_length], byteorder='big') & self.address_mask
+
+    def host_command(self, mosi):
+        """
+        Returns (frame type, command code) if MOSI holds a host command, otherwise None.
+        """
+        raise NotImplementedError
+
+    def read_data(self, miso):
+        """
+        Returns the data bytes from the MISO bytes of a read or None.
+        """
+        raise NotImplementedError
+
+    def read_wait(self, miso):
+        """
+        Returns the number of wait bytes between the header and the data of a read or None if the data never started.
+        """
+        return None
+
+    def read_value(self, miso):
+        """
+        Returns the little-endian value from the MISO bytes of a read or None.
+        """
+        data_bytes = self.read_data(miso)
+        if data_bytes is None:
+            return None
+
+        return int.from_bytes(data_bytes, byteorder='little')
+
+    def write_value(self, mosi):
+        """
+        Returns the first up to 4 bytes of little-endian write data after the header or None.
+        """
+        data_bytes = mosi[self.header_length:self.header_length + 4]
+        if not data_bytes:
+            return None
+
+        return int.from_bytes(data_bytes, byteorder='little')
+
+    def decode_dl_command(self, value):
+        """
+        Returns (name, parameter bits) for a display list command word, name is None for unknown commands.
+        """
+        if value & 0xC0000000 == 0x40000000:
+            return "DL_VERTEX2F", value & 0x3FFFFFFF
+
+        if value & 0xC0000000 == 0x80000000:
+            return "DL_VERTEX2II", value & 0x3FFFFFFF
+
+        return self.dl_commands.get(value & 0xFF000000), value & 0x00FFFFFF
+
+
+class FT81xProfile(Profile):
+    """
+    FT81x / BT81x: 3-byte header with a 22-bit address, reads have a dummy byte before the data,
+    host commands are 3 bytes.
+    """
+    header_length = 3
+    address_mask = 0x3FFFFF
+    read_min_length = 5
+
+    def header_kind(self, byte):
+        # 00 read, 10 write, 01 host command, 11 is not used
+        return (HEADER_READ, HEADER_HOST, HEADER_WRITE, HEADER_INVALID)[byte >> 6]
+
+    def host_command(self, mosi):
+        # ACTIVE is 0x00 0x00 0x00, the other host commands start with 01
+        if len(mosi) == 3 and self.header_kinds[mosi[0]] != HEADER_WRITE:
+            return 'host', mosi[0]
+        return None
+
+    def read_data(self, miso):
+        data_bytes = miso[4:8]  # Skip 3-byte addr + dummy, only take max 4
+        if not data_bytes:
+            return None
+
+        return data_bytes
+
+
+class BT82xProfile(Profile):
+    """
+    BT82x: 4-byte header with a 31-bit address, reads return wait bytes until the sync byte 0x01,
+    host commands are 5 bytes.
+    """
+    header_length = 4
+    address_mask = 0x7FFFFFFF
+    wait_states = True
+
+    def header_kind(self, byte):
+        # bit 7 selects write, host commands start with 0xFF like the writes to 0x7F000000 and up
+        # and are told apart by their length
+        return HEADER_WRITE if byte & 0x80 else HEADER_READ
+
+    def host_command(self, mosi):
+        if len(mosi) == 5:
+            if mosi[0] == 0xFF:
+                if (mosi[1] & 0xF0) == 0xE0:
+                    return 'host', mosi[1]
+            elif not any(mosi):
+                return 'active', 0
+        return None
+
+    def read_data(self, miso):
+        """
+        Finds sync byte (0x01) in MISO buffer, returns the following
+        1, 2, or 4 bytes (whichever applies).
+        """
+        sync_index = miso.find(0x01)
+        if sync_index < 0:
+            return None  # Sync byte not found
+
+        data_len = len(miso) - sync_index - 1
+
+        # Try longest possible value first
+        if data_len >= 4:
+            length = 4
+        elif data_len >= 2:
+            length = 2
+        elif data_len >= 1:
+            length = 1
+        else:
+            return None  # No data after sync byte
+
+        return miso[sync_index + 1:sync_index + 1 + length]
+
+    def read_wait(self, miso):
+        sync_index = miso.find(0x01)
+        if sync_index < 0:
+            return None
+
+        return max(sync_index - self.header_length, 0)
@@ -0,0 +1,61 @@
+# Checkpoints of the decoder state, plain values that can be stored as JSON
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import base64
+import zlib
+from copy import deepcopy
+
+
+def pack_bytes(data):
+    """
+    Returns bytes as a string for a checkpoint, compressed since most of a display list shadow is zeros.
+    """
+    return base64.b64encode(zlib.compress(bytes(data))).decode('ascii')
+
+
+def unpack_bytes(text):
+    return zlib.decompress(base64.b64decode(text))
+
+
+class PlainState:
+    """
+    state() and restore() for the classes that keep their state in the attributes named in STATE,
+    all of them ints, floats, strings, None or lists or dicts of those.
+    """
+    STATE = ()
+
+    def state(self):
+        """
+        Returns the state as a dict for a checkpoint.
+        """
+        return {name: deepcopy(getattr(self, name)) for name in self.STATE}
+
+    def restore(self, state):
+        """
+        Continues from the state of a checkpoint.
+        """
+        for name in self.STATE:
+            setattr(self, name, deepcopy(state[name]))
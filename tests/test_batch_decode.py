@@ -0,0 +1,101 @@
+# Tests for tools/batch_decode.py against Hla, skipped without numpy
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+import batch_decode  # noqa: E402
+import benchmark  # noqa: E402
+from mapped_trace import write_mapped  # noqa: E402
+from replay import load_analyzer, write_trace  # noqa: E402
+
+
+def traffic(extension):
+    """
+    The transaction types of tools/benchmark.py interleaved, with short and header-only transactions in between.
+    """
+    load_analyzer(extension)  # benchmark.py builds the command stream from the extension module
+    profile = benchmark.PROFILES[extension]
+    streams = []
+    for kind in benchmark.kinds(extension):
+        short = kind in ("reg-poll", "host-command", "boot-status")
+        streams.append(benchmark.transactions(extension, kind, 24 if short else 3))
+    header = profile["header"]
+    streams.append([
+        (b"\x30", b"\x00"),
+        (header(profile["REG_CMD_READ"], False), bytes(len(header(0, False)))),
+        (header(profile["REG_CMD_READ"], True), bytes(len(header(0, True)))),
+        (header(0x1000, True) + b"\x01\x02", bytes(len(header(0, True)) + 2)),
+        (header(profile["RAM_DL"], True) + b"\x00\x00\x00\x02", bytes(len(header(0, True)) + 4)),
+    ])
+    return [tx for group in itertools.zip_longest(*streams) for tx in group if tx is not None]
+
+
+@unittest.skipIf(batch_decode.np is None, "batch_decode.py needs numpy")
+class BatchDecodeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def check(self, extension):
+        frames = benchmark.spi_frames(traffic(extension))
+        profile = sys.modules[extension].PROFILE
+        arrays = batch_decode.transactions_from_frames(iter(frames))
+        columns = batch_decode.decode_batch(profile, *arrays)
+        reference = batch_decode.decode_with_hla(extension, iter(frames))
+        self.assertEqual(len(columns["start_time"]), len(reference["start_time"]))
+        self.assertEqual(batch_decode.compare(columns, reference), [])
+
+        # the trace file loaders give the arrays of the frames, mapped trace files rebuild the byte times to 1 ps
+        np = batch_decode.np
+        trace = os.path.join(self.directory, "capture.trace")
+        mapped = os.path.join(self.directory, "capture.map")
+        write_trace(trace, frames)
+        write_mapped(mapped, frames)
+        for path in (trace, mapped):
+            for loaded, expected in zip(batch_decode.load_transactions(path), arrays):
+                if expected.dtype.kind == "f":
+                    self.assertTrue(np.allclose(loaded, expected, rtol=0, atol=1e-12), path)
+                else:
+                    self.assertTrue(np.array_equal(loaded, expected), path)
+
+    def test_ft81x(self):
+        self.check("EmbeddedVideoEngine")
+
+    def test_bt82x(self):
+        self.check("EmbeddedVideoEngine5")
+
+
+if __name__ == "__main__":
+    unittest.main()
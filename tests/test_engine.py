@@ -0,0 +1,283 @@
+# Regression tests for the decoder, run with python -m unittest discover tests
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from replay import AnalyzerFrame, load_analyzer  # noqa: E402
+from eve_core.export import read_columns  # noqa: E402
+
+
+def transaction(mosi, miso=None, start_time=0.0, byte_time=1e-7):
+    """
+    Returns the enable/result/disable frames of one transaction.
+    """
+    miso = miso or bytes(len(mosi))
+    frames = [AnalyzerFrame("enable", start_time, start_time, {})]
+    for index, (mosi_byte, miso_byte) in enumerate(zip(mosi, miso)):
+        time = start_time + index * byte_time
+        frames.append(AnalyzerFrame("result", time, time + byte_time / 2,
+                                    {"mosi": bytes((mosi_byte,)), "miso": bytes((miso_byte,))}))
+    end_time = start_time + len(mosi) * byte_time
+    frames.append(AnalyzerFrame("disable", end_time, end_time, {}))
+    return frames
+
+
+def decode(hla, frames):
+    """
+    Returns the frames the analyzer produces for the input frames.
+    """
+    output = []
+    for frame in frames:
+        result = hla.decode(frame)
+        if result is not None:
+            output.extend(result if isinstance(result, list) else (result,))
+    return output
+
+
+class HeaderOnlyTest(unittest.TestCase):
+    def test_bt82x_header_only_read_is_read_error(self):
+        hla = load_analyzer("EmbeddedVideoEngine5", {"polling": "Show every read"})
+        frames = decode(hla, transaction(b"\x7f\x00\x60\x00"))
+        self.assertEqual([frame.type for frame in frames], ["read_error"])
+        self.assertEqual(frames[0].data["address"], 0x7F006000)
+
+    def test_bt82x_header_only_write_is_truncated(self):
+        hla = load_analyzer("EmbeddedVideoEngine5", {"polling": "Show every read"})
+        frames = decode(hla, transaction(b"\xff\x00\x60\x00"))
+        self.assertEqual([(frame.type, frame.data["anomaly"]) for frame in frames], [("anomaly", "truncated")])
+
+
+class WaitStatesTest(unittest.TestCase):
+    def test_bt82x_read_has_wait_bytes(self):
+        hla = load_analyzer("EmbeddedVideoEngine5", {"polling": "Show every read"})
+        # 4-byte header, two wait bytes, the sync byte and 4 bytes of data
+        mosi = b"\x7f\x00\x60\x00" + bytes(7)
+        miso = bytes(6) + b"\x01\x78\x56\x34\x12"
+        frames = decode(hla, transaction(mosi, miso))
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0].data["value"], 0x12345678)
+        self.assertEqual(frames[0].data["wait"], 2)
+        self.assertAlmostEqual(frames[0].data["wait_time"], 2e-7)
+
+    def test_bt82x_histogram_every_window(self):
+        hla = load_analyzer("EmbeddedVideoEngine5", {"polling": "Show every read", "window": 10.0})
+        mosi = b"\x7f\x00\x60\x00" + bytes(7)
+        frames = []
+        for index, wait in enumerate((2, 3, 2, 4)):
+            miso = bytes(4 + wait) + b"\x01\x78\x56\x34\x12"
+            frames += decode(hla, transaction(mosi + bytes(wait - 2), miso, start_time=index * 6e-3))
+        # the first read starts the window, the third one is 12 ms later
+        reports = [frame for frame in frames if frame.type == "wait_states"]
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0].data["histogram"], "2:2 3:1")
+        self.assertEqual(reports[0].data["reads"], 3)
+
+
+class FilterTest(unittest.TestCase):
+    def test_ft81x_host_commands_do_not_match_ram_g(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"filter": "RAM_G", "writes": "Show every write"})
+        frames = decode(hla, transaction(b"\x00\x00\x00") + transaction(b"\x44\x00\x00")
+                        + transaction(b"\x80\x10\x00\x01\x02\x03\x04"))
+        self.assertEqual([(frame.type, frame.data["address"]) for frame in frames], [("mem_write", 0x1000)])
+
+    def test_transactions_only_applies_the_filter(self):
+        # a write to 0x1000, ACTIVE and a read of REG_ID
+        for extension, reg_id, write, active in (
+                ("EmbeddedVideoEngine", 0x302000, b"\x80\x10\x00\x01\x02\x03\x04", bytes(3)),
+                ("EmbeddedVideoEngine5", 0x7F006000, b"\x80\x00\x10\x00\x01\x02\x03\x04", bytes(5))):
+            hla = load_analyzer(extension, {"filter": "REG_ID", "detail": "Transactions only"})
+            read = reg_id.to_bytes(hla.header_length, "big") + bytes(8)
+            frames = decode(hla, transaction(write) + transaction(active) + transaction(read))
+            self.assertEqual([frame.data["address"] for frame in frames], [reg_id], extension)
+
+
+def words(*values):
+    return struct.pack("<%dI" % len(values), *values)
+
+
+# FT81x write to REG_CMDB_WRITE and co-processor commands
+CMDB_WRITE = b"\xb0\x25\x78"
+CMD_SWAP = 0xFFFFFF01
+CMD_TEXT = 0xFFFFFF0C
+CMD_MEMWRITE = 0xFFFFFF1A
+CMD_INFLATE = 0xFFFFFF22
+OPT_FORMAT = 0x1000
+
+
+class CoproParserTest(unittest.TestCase):
+    def setUp(self):
+        self.hla = load_analyzer("EmbeddedVideoEngine")
+
+    def commands(self, frames):
+        return [frame for frame in decode(self.hla, frames) if frame.type != "burst"]
+
+    def test_text_split_over_two_bursts(self):
+        text = b"Hello, world\0\0\0\0"
+        frames = self.commands(transaction(CMDB_WRITE + words(CMD_TEXT, (20 << 16) | 10, 28) + text[:4])
+                               + transaction(CMDB_WRITE + text[4:] + words(CMD_SWAP), start_time=1e-3))
+        self.assertEqual([frame.type for frame in frames], ["copro_text", "copro_text", "copro"])
+        first, second, swap = frames
+        self.assertTrue(first.data["incomplete"])
+        self.assertEqual(first.data["text"], "Hell")
+        self.assertTrue(second.data["continued"])
+        self.assertEqual(second.data["text"], "Hello, world")
+        self.assertEqual(second.data["payload"], 16)
+        self.assertEqual(swap.data["command"], "CMD_SWAP")
+
+        # words 0 to 3 of the first burst, bytes 3 to 18 after the header, and the words of the second burst
+        self.assertAlmostEqual(first.start_time, 3e-7)
+        self.assertAlmostEqual(first.end_time, 18.5e-7)
+        self.assertAlmostEqual(second.start_time, 1e-3 + 3e-7)
+        self.assertAlmostEqual(second.end_time, 1e-3 + 14.5e-7)
+        self.assertAlmostEqual(swap.start_time, 1e-3 + 15e-7)
+        self.assertAlmostEqual(swap.end_time, 1e-3 + 18.5e-7)
+
+    def test_format_arguments(self):
+        # OPT_FORMAT takes one word per conversion and per '*', none for '%%'
+        text = b"%*d%%%s\0"
+        frames = self.commands(transaction(CMDB_WRITE + words(CMD_TEXT, 0, OPT_FORMAT << 16) + text
+                                           + words(4, 7, 0x1000, CMD_SWAP)))
+        self.assertEqual([frame.data["command"] for frame in frames], ["CMD_TEXT", "CMD_SWAP"])
+        self.assertEqual(frames[0].data["args"], words(0, OPT_FORMAT << 16, 4, 7, 0x1000))
+
+    def test_inflate_over_two_bursts(self):
+        data = bytes(range(256)) * 64
+        stream = zlib.compress(data)
+        padded = stream + bytes(-len(stream) & 3)
+        frames = self.commands(transaction(CMDB_WRITE + words(CMD_INFLATE, 0x1000) + padded[:40])
+                               + transaction(CMDB_WRITE + padded[40:] + words(CMD_SWAP), start_time=1e-3))
+        self.assertEqual([frame.type for frame in frames], ["copro_inflate", "copro_inflate", "copro"])
+        self.assertTrue(frames[0].data["incomplete"])
+        self.assertTrue(frames[1].data["continued"])
+        self.assertEqual(frames[1].data["inflated"], len(data))
+        self.assertEqual(frames[1].data["ratio"], round(len(data) / len(stream), 2))
+        self.assertEqual(frames[1].data["payload"], len(padded))
+        self.assertEqual(frames[2].data["command"], "CMD_SWAP")
+
+    def test_memwrite_padding(self):
+        # 5 bytes of data are padded to 8, the next word is a command again
+        frames = self.commands(transaction(CMDB_WRITE + words(CMD_MEMWRITE, 0x2000, 5) + b"abcde\0\0\0"
+                                           + words(CMD_SWAP)))
+        self.assertEqual([frame.data["command"] for frame in frames], ["CMD_MEMWRITE", "CMD_SWAP"])
+        self.assertEqual(frames[0].data["payload"], 8)
+        self.assertAlmostEqual(frames[0].end_time, 22.5e-7)
+        self.assertAlmostEqual(frames[1].start_time, 23e-7)
+
+
+class ShadowTest(unittest.TestCase):
+    def upload(self, hla, payload, start_time):
+        return [frame for frame in decode(hla, transaction(CMDB_WRITE + payload, start_time=start_time))
+                if frame.type != "burst"]
+
+    def test_repeated_memwrite_is_unchanged(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"shadow": "Shadow"})
+        memwrite = words(CMD_MEMWRITE, 0x2000, 6) + b"abcdef\0\0"
+        first = self.upload(hla, memwrite, 0.0)[0]
+        second = self.upload(hla, memwrite, 1e-3)[0]
+        self.assertNotIn("unchanged", first.data)
+        self.assertTrue(second.data["unchanged"])
+        self.assertEqual((second.data["ram_g_written"], second.data["ram_g_unchanged"], second.data["ram_g_repeated"]),
+                         (12, 6, 1))
+
+    def test_repeated_inflate_over_two_bursts_is_unchanged(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"shadow": "Shadow"})
+        stream = zlib.compress(bytes(range(256)) * 64)
+        padded = stream + bytes(-len(stream) & 3)
+        frames = []
+        for start_time in (0.0, 1e-3):
+            frames += self.upload(hla, words(CMD_INFLATE, 0x1000) + padded[:40], start_time)
+            frames += self.upload(hla, padded[40:], start_time + 1e-4)
+        self.assertEqual([frame.data.get("unchanged", False) for frame in frames], [False, False, False, True])
+        self.assertEqual(frames[3].data["ram_g_repeated"], 1)
+        summary = hla.finish()[-1]
+        self.assertEqual((summary.data["uploads"], summary.data["repeated"]), (2, 1))
+
+    def test_changed_inflate_is_not_repeated(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"shadow": "Shadow"})
+        for data in (bytes(8192), bytes(4096) + b"\1" * 4096):
+            stream = zlib.compress(data)
+            frames = self.upload(hla, words(CMD_INFLATE, 0x1000) + stream + bytes(-len(stream) & 3), 0.0)
+        self.assertNotIn("unchanged", frames[0].data)
+        self.assertEqual(frames[0].data["ram_g_repeated"], 0)
+
+    def test_checkpoint_keeps_the_shadow(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"shadow": "Shadow"})
+        memwrite = words(CMD_MEMWRITE, 0x2000, 6) + b"abcdef\0\0"
+        self.upload(hla, memwrite, 0.0)
+        resumed = load_analyzer("EmbeddedVideoEngine", {"shadow": "Shadow"})
+        resumed.restore(json.loads(json.dumps(hla.state())))
+        for analyzer in (hla, resumed):
+            frame = self.upload(analyzer, memwrite, 1e-3)[0]
+            self.assertTrue(frame.data["unchanged"])
+            self.assertEqual((frame.data["ram_g_written"], frame.data["ram_g_repeated"]), (12, 1))
+
+
+class GraphTime:
+    """
+    Absolute time like in Logic 2: differences are numbers, the time itself is not.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __sub__(self, other):
+        return self.seconds - other.seconds
+
+    def __add__(self, seconds):
+        return GraphTime(self.seconds + seconds)
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_relative_times_written_without_finish(self):
+        hla = load_analyzer("EmbeddedVideoEngine", {"export": self.directory})
+        frames = []
+        for index in range(12):
+            frames += transaction(b"\x80\x10\x00\x01\x02\x03\x04", start_time=GraphTime(1e6 + index * 0.25))
+        for frame in frames:
+            hla.decode(frame)
+        columns = read_columns(self.directory)
+        # one second of capture time is flushed while decoding, finish() is never called
+        self.assertGreaterEqual(len(columns["start_time"]), 4)
+        self.assertEqual(columns["start_time"][0], 0.0)
+        self.assertAlmostEqual(columns["start_time"][4], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# Tests for the mapped trace files of tools/replay.py --map
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from mapped_trace import MAPPED_RECORD, NO_TIMES, MappedTrace, write_mapped  # noqa: E402
+from test_engine import transaction  # noqa: E402
+
+
+def frame_tuples(frames):
+    return [(frame.type, round(frame.start_time, 11), round(frame.end_time, 11), dict(frame.data)) for frame in frames]
+
+
+class MappedTraceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.path = os.path.join(directory, "capture.map")
+
+    def test_frames_round_trip(self):
+        frames = transaction(b"\x80\x10\x00\x01\x02\x03\x04", start_time=0.25)
+        uneven = transaction(b"\x00\x10\x00\x00\x00\x00\x00", b"\x00\x00\x00\x00\x78\x56\x34", start_time=0.5)
+        uneven[3].start_time += 3e-8  # a gap in the clock after the second byte
+        frames += uneven + transaction(b"\x00\x00\x00", start_time=0.75)
+        self.assertEqual(write_mapped(self.path, frames, index_step=2), 3)
+
+        with MappedTrace(self.path) as trace:
+            self.assertEqual(frame_tuples(trace.frames()), frame_tuples(frames))
+            self.assertEqual([trace.record(number)[-1] == NO_TIMES for number in range(3)], [True, False, True])
+            self.assertEqual(trace.span(0.5, 0.6), (1, 2))
+            self.assertEqual(frame_tuples(trace.range(0.7)), frame_tuples(frames[-5:]))
+
+    def test_evenly_spaced_bytes_have_no_byte_times(self):
+        frames = []
+        for index in range(100):
+            frames += transaction(bytes(range(32)), start_time=index * 1e-4)
+        write_mapped(self.path, frames)
+        # records and the byte heaps, no 16 bytes of times per byte
+        self.assertLess(os.path.getsize(self.path), 100 * (MAPPED_RECORD.size + 2 * 32) + 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
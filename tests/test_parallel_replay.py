@@ -0,0 +1,70 @@
+# Tests for tools/parallel_replay.py against the sequential replay
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+import benchmark  # noqa: E402
+import parallel_replay  # noqa: E402
+from mapped_trace import write_mapped  # noqa: E402
+from test_batch_decode import traffic  # noqa: E402
+
+
+class ParallelReplayTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.path = os.path.join(directory, "capture.map")
+
+    def check(self, extension, settings):
+        write_mapped(self.path, benchmark.spi_frames(traffic(extension)))
+        records = parallel_replay.decode_parallel(extension, settings, self.path, 2, 5)
+        self.assertEqual(records, parallel_replay.decode_sequential(extension, settings, self.path))
+
+    def test_ft81x(self):
+        self.check("EmbeddedVideoEngine", {"polling": "Collapse"})
+
+    def test_bt82x(self):
+        self.check("EmbeddedVideoEngine5", {"writes": "Show every write"})
+
+    def test_shadow(self):
+        self.check("EmbeddedVideoEngine5", {"shadow": "Shadow"})
+
+    def test_frames_mode_is_rejected(self):
+        write_mapped(self.path, benchmark.spi_frames(traffic("EmbeddedVideoEngine5")))
+        with self.assertRaises(ValueError):
+            parallel_replay.decode_parallel("EmbeddedVideoEngine5", {"mode": "Frames"}, self.path, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,398 @@
+# Vectorized batch decoder for recorded captures
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Decodes all transactions of a recorded capture at once with numpy instead of one Hla.decode call per frame:
+# header extraction, read/write and host command classification, the memory region and register from
+# np.searchsorted against the tables of the chip profile and the values assembled from little-endian views.
+# The result has the columns of the columnar export (eve_core/export.py), --check decodes the capture with Hla
+# as well and fails if any column differs.
+# Mapped trace files (replay.py --map) and binary trace files are loaded with numpy.frombuffer() on the file,
+# only Logic 2 CSV exports go through the frames.
+#
+# python tools/batch_decode.py -e EmbeddedVideoEngine5 capture.trace --check
+# python tools/batch_decode.py -e EmbeddedVideoEngine capture.csv --export columns
+
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TOOLS_DIR)
+
+from mapped_trace import MAPPED_MAGIC, NO_TIMES, MappedTrace  # noqa: E402
+from replay import EXTENSIONS, REPO_DIR, TRACE_MAGIC, TRACE_RECORD, Replay, load_analyzer, read_frames  # noqa: E402
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from eve_core.export import COLUMNS, NO_REGION, read_columns  # noqa: E402
+from eve_core.memory import REGION_CMDB, REGION_RAM_CMD  # noqa: E402
+from eve_core.profile import HEADER_HOST, HEADER_INVALID, HEADER_READ, HEADER_WRITE, BT82xProfile  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def transactions_from_frames(frames):
+    """
+    Collects the enable/result/disable frames into arrays: start and end time per transaction,
+    offsets of the transactions into the MOSI and MISO bytes (one more than transactions) and the bytes.
+    Transactions without bytes are dropped like Hla drops them.
+    """
+    start_times = []
+    end_times = []
+    offsets = [0]
+    mosi = bytearray()
+    miso = bytearray()
+    start_time = end_time = None
+
+    for frame in frames:
+        kind = frame.type
+        if kind == "result":
+            raw_mosi = frame.data.get("mosi")
+            raw_miso = frame.data.get("miso")
+            if raw_mosi is None or raw_miso is None:
+                continue
+            mosi.append(raw_mosi[0])
+            miso.append(raw_miso[0])
+            end_time = frame.end_time
+        elif kind == "enable":
+            # bytes outside of a transaction are dropped like Hla drops them
+            start_time = frame.start_time
+            del mosi[offsets[-1]:]
+            del miso[offsets[-1]:]
+        elif kind == "disable":
+            if len(mosi) > offsets[-1]:
+                start_times.append(start_time)
+                end_times.append(end_time)
+                offsets.append(len(mosi))
+            else:
+                offsets[-1] = len(mosi)
+
+    del mosi[offsets[-1]:]
+    del miso[offsets[-1]:]
+    return (np.array(start_times, dtype=np.float64), np.array(end_times, dtype=np.float64),
+            np.array(offsets, dtype=np.int64), np.frombuffer(bytes(mosi), dtype=np.uint8),
+            np.frombuffer(bytes(miso), dtype=np.uint8))
+
+
+def transactions_from_mapped(path):
+    """
+    The arrays of transactions_from_frames() for a mapped trace file, read from the records and the byte heaps.
+    """
+    record = np.dtype([("start", "<f8"), ("end", "<f8"), ("first", "<f8"), ("period", "<f8"), ("duration", "<f8"),
+                       ("offset", "<u8"), ("length", "<u8"), ("times", "<u8")])
+    with MappedTrace(path) as trace:
+        # copies, the map can only be closed without views into it
+        def heap(dtype, count, offset):
+            return np.frombuffer(trace.map, dtype, count, offset).copy()
+
+        records = heap(record, trace.count, trace.records_offset)
+        records = records[records["length"] > 0]
+        mosi = heap(np.uint8, trace.spi_bytes, trace.mosi_offset)
+        miso = heap(np.uint8, trace.spi_bytes, trace.miso_offset)
+
+        # the end of the last byte, from the record like MappedTrace.frames() or from the times heap
+        last = records["length"].astype(np.int64) - 1
+        end_times = records["first"] + last * records["period"] + records["duration"]
+        explicit = records["times"] != NO_TIMES
+        if explicit.any():
+            positions = records["times"][explicit].astype(np.int64) + last[explicit]
+            times = heap("<f8", 2 * int(positions.max()) + 2, trace.times_offset)
+            end_times[explicit] = times[2 * positions + 1]
+        spi_bytes = trace.spi_bytes
+
+    offsets = np.append(records["offset"].astype(np.int64), spi_bytes)
+    return records["start"].copy(), end_times, offsets, mosi, miso
+
+
+def transactions_from_trace(path):
+    """
+    The arrays of transactions_from_frames() for a binary trace file. Only the positions of the records are
+    found in a loop, results are longer by the MOSI and MISO byte, the fields are gathered with numpy.
+    """
+    with open(path, "rb") as file:
+        buffer = file.read()
+    if buffer[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError(f"{path} is not a trace file")
+
+    record_size = TRACE_RECORD.size
+    positions = array("q")
+    append = positions.append
+    position = len(TRACE_MAGIC)
+    size = len(buffer)
+    while position < size:
+        append(position)
+        position += record_size + 2 if buffer[position] == 1 else record_size
+
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    positions = np.frombuffer(positions, dtype=np.int64)
+
+    def times(field):
+        window = data[positions[:, None] + (1 + 8 * field) + np.arange(8)]
+        return np.ascontiguousarray(window).view("<f8").ravel()
+
+    kinds = data[positions]
+    result = kinds == 1
+    start_times = times(0)
+    end_times = times(1)
+
+    # like transactions_from_frames(): the results since the last enable or disable belong to the disable,
+    # enable drops them, the start time is the one of the last enable
+    control = np.flatnonzero(~result)
+    segment = np.cumsum(~result)[result]
+    control_kinds = kinds[control]
+    enable_starts = np.where(control_kinds == 0, start_times[control], np.nan)
+    last_enable = np.maximum.accumulate(np.where(control_kinds == 0, np.arange(len(control)), -1))
+    ends = np.zeros(len(control) + 1, dtype=bool)
+    ends[:-1] = control_kinds == 2
+    keep = ends[segment]
+    segment = segment[keep]
+    counts = np.bincount(segment, minlength=len(control) + 1)
+    closed = np.flatnonzero(counts)
+
+    result_positions = positions[result][keep]
+    result_end_times = end_times[result][keep]
+    offsets = np.concatenate(([0], np.cumsum(counts[closed])))
+    previous = last_enable[closed - 1]
+    start = np.where((closed > 0) & (previous >= 0), enable_starts[np.maximum(previous, 0)], np.nan)
+    return (start, result_end_times[offsets[1:] - 1], offsets, data[result_positions + record_size].copy(),
+            data[result_positions + record_size + 1].copy())
+
+
+def load_transactions(path):
+    """
+    The arrays of transactions_from_frames() for any capture read_frames() takes.
+    """
+    with open(path, "rb") as file:
+        magic = file.read(len(MAPPED_MAGIC))
+    if magic == MAPPED_MAGIC:
+        return transactions_from_mapped(path)
+    if magic == TRACE_MAGIC:
+        return transactions_from_trace(path)
+    return transactions_from_frames(read_frames(path))
+
+
+def gather(data, positions, counts, width=4):
+    """
+    Returns the little-endian values of up to width bytes at the positions, bytes past counts are zero.
+    """
+    padded = np.concatenate((data, np.zeros(width, dtype=np.uint8)))
+    index = positions[:, None] + np.arange(width)
+    window = padded[np.minimum(index, len(padded) - 1)]
+    window[np.arange(width)[None, :] >= counts[:, None]] = 0
+    if width < 4:
+        window = np.concatenate((window, np.zeros((len(window), 4 - width), dtype=np.uint8)), axis=1)
+    return np.ascontiguousarray(window).view('<u4').ravel().astype(np.int64)
+
+
+def decode_batch(profile, start_times, end_times, offsets, mosi, miso):
+    """
+    Decodes the transactions in the arrays, returns a dict with one numpy array per column of the columnar export
+    and 'register', the index into sorted(profile.registers) or -1. The times are relative to the first
+    transaction like in the export.
+    """
+    header_length = profile.header_length
+    first = offsets[:-1]
+    lengths = offsets[1:] - first
+    count = len(first)
+    padded = np.concatenate((mosi, np.zeros(8, dtype=np.uint8)))
+    byte0 = padded[first]
+    byte1 = padded[first + 1]
+
+    # header: class of the first byte and the big-endian address
+    kinds = np.frombuffer(profile.header_kinds, dtype=np.uint8)[byte0].astype(np.uint8)
+    header = padded[first[:, None] + np.arange(header_length)]
+    if header_length < 4:
+        header = np.concatenate((np.zeros((count, 4 - header_length), dtype=np.uint8), header), axis=1)
+    address = np.ascontiguousarray(header).view('>u4').ravel().astype(np.int64) & profile.address_mask
+
+    # memory region and register
+    memory = profile.memory
+    regions = np.array([region for region, _ in memory.entries], dtype=np.uint8)
+    region = regions[np.searchsorted(np.array(memory.starts, dtype=np.int64), address, side='right') - 1]
+    register_addresses = np.array(sorted(profile.registers), dtype=np.int64)
+    register = np.searchsorted(register_addresses, address)
+    found = register < len(register_addresses)
+    found[found] = register_addresses[register[found]] == address[found]
+    register = np.where(found, register, -1)
+
+    # values: reads from MISO, writes from the bytes after the header
+    value = np.full(count, -1, dtype=np.int64)
+    read = (kinds == HEADER_READ) & (lengths >= header_length)
+    write = (kinds == HEADER_WRITE) & (lengths > header_length)
+    value[write] = gather(mosi, first[write] + header_length, np.minimum(lengths[write] - header_length, 4))
+
+    if isinstance(profile, BT82xProfile):
+        # the data follows the first sync byte 0x01 with 4, 2 or 1 bytes
+        ones = np.flatnonzero(miso == 1)
+        index = np.searchsorted(ones, first[read])
+        sync = np.append(ones, len(miso))[index]
+        rest = first[read] + lengths[read] - sync - 1
+        data_length = np.where(rest >= 4, 4, np.where(rest >= 2, 2, np.where(rest >= 1, 1, 0)))
+        valid = (sync < first[read] + lengths[read]) & (data_length > 0)
+        read_value = np.full(len(sync), -1, dtype=np.int64)
+        read_value[valid] = gather(miso, sync[valid] + 1, data_length[valid])
+        value[read] = read_value
+    else:
+        # 3-byte header and a dummy byte
+        data_length = np.minimum(lengths[read] - 4, 4)
+        valid = data_length > 0
+        read_value = np.full(len(data_length), -1, dtype=np.int64)
+        read_value[valid] = gather(miso, first[read][valid] + 4, data_length[valid])
+        value[read] = read_value
+
+    copro = write & (lengths >= header_length + 4) & ((region == REGION_CMDB) | (region == REGION_RAM_CMD))
+    command = np.where(copro, value, -1)
+
+    # host commands
+    if header_length == 3:
+        host = (lengths == 3) & (kinds != HEADER_WRITE)
+        host_code = byte0
+    else:
+        five = lengths == 5
+        host_code = np.where(byte0 == 0xFF, byte1, 0)
+        zero = np.zeros(count, dtype=bool)
+        zero[five] = ~padded[first[five][:, None] + np.arange(5)].any(axis=1)
+        host = five & (((byte0 == 0xFF) & ((byte1 & 0xF0) == 0xE0)) | zero)
+
+    direction = kinds.copy()
+    data_bytes = lengths - header_length
+    short = ~host & (lengths < header_length)
+    for mask, kind in ((host, HEADER_HOST), (short, HEADER_INVALID)):
+        direction[mask] = kind
+        address[mask] = 0
+        region[mask] = NO_REGION
+        value[mask] = -1
+        data_bytes[mask] = 0
+        register[mask] = -1
+    command[host] = host_code[host]
+    command[short] = -1
+
+    origin = start_times[0] if count else 0.0
+    return {
+        "start_time": start_times - origin,
+        "end_time": end_times - origin,
+        "direction": direction,
+        "address": address.astype(np.uint32),
+        "region": region,
+        "value": value,
+        "command": command,
+        "length": data_bytes.astype(np.uint32),
+        "register": register,
+    }
+
+
+def decode_with_hla(extension, frames):
+    """
+    Decodes the frames with Hla and the columnar export, returns the columns as numpy arrays.
+    """
+    directory = tempfile.mkdtemp(prefix="eve_columns_")
+    try:
+        replay = Replay(load_analyzer(extension, {"export": directory}))
+        for _ in replay.run(frames):
+            pass
+        columns = read_columns(directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {name: np.array(columns[name], dtype=dtype) for name, _, dtype in COLUMNS}
+
+
+def compare(batch, reference):
+    """
+    Returns the names of the columns that differ.
+    """
+    return [name for name, _, _ in COLUMNS
+            if len(batch[name]) != len(reference[name]) or not np.array_equal(batch[name], reference[name])]
+
+
+def write_columns(directory, columns, first_time=None):
+    """
+    Writes the columns in the layout of the columnar export, first_time is the absolute start of the first row.
+    """
+    from eve_core.export import ColumnarExport
+
+    export = ColumnarExport(directory)
+    export.first_time = first_time
+    export.rows = len(columns["start_time"])
+    for name, _, dtype in COLUMNS:
+        columns[name].astype(dtype).tofile(export.path(name))
+    export.write_schema()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decodes a recorded capture with numpy.")
+    parser.add_argument("capture", help="Logic 2 SPI export (CSV) or binary trace file")
+    parser.add_argument("-e", "--extension", choices=EXTENSIONS, default="EmbeddedVideoEngine5")
+    parser.add_argument("--export", metavar="DIR", help="write the columns in the layout of the columnar export")
+    parser.add_argument("--check", action="store_true", help="decode with Hla as well and compare")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("batch_decode.py needs numpy", file=sys.stderr)
+        return 2
+
+    extension_dir = os.path.join(REPO_DIR, args.extension)
+    if extension_dir not in sys.path:
+        sys.path.insert(0, extension_dir)
+    profile = importlib.import_module(args.extension).PROFILE
+
+    clock = time.perf_counter
+    started = clock()
+    arrays = load_transactions(args.capture)
+    loaded = clock()
+    columns = decode_batch(profile, *arrays)
+    decoded = clock()
+    count = len(columns["start_time"])
+    print(f"{count} transactions, loaded in {loaded - started:.3f} s, decoded in {decoded - loaded:.3f} s: "
+          f"{count / max(decoded - loaded, 1e-9):,.0f} transactions/s", file=sys.stderr)
+
+    if args.export:
+        write_columns(args.export, columns, float(arrays[0][0]) if count else None)
+
+    if args.check:
+        started = clock()
+        reference = decode_with_hla(args.extension, read_frames(args.capture))
+        elapsed = clock() - started
+        print(f"Hla: {elapsed:.3f} s, {count / max(elapsed, 1e-9):,.0f} transactions/s", file=sys.stderr)
+        differences = compare(columns, reference)
+        if differences:
+            print(f"columns differ from Hla: {', '.join(differences)}", file=sys.stderr)
+            return 1
+        print("identical to Hla", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+# Decoder benchmark for the High Level Analyzers of this repository
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Synthesizes SPI traffic for FT81x and BT82x and measures Hla.decode per transaction type:
+# throughput, latency of the 'disable' frame that does the decoding, peak memory, the memory blocks that outlive
+# a decode call and the memory blocks left allocated at the end.
+#
+# python tools/benchmark.py
+# python tools/benchmark.py -e EmbeddedVideoEngine5 -k cmdb-burst --json results.json
+# python tools/benchmark.py --compare results.json --tolerance 0.2
+
+import argparse
+import gc
+import json
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay import EXTENSIONS, load_analyzer
+from saleae.analyzers import AnalyzerFrame
+
+BYTE_TIME = 50e-9  # 20 MHz SPI
+GAP_TIME = 1e-6    # chip select inactive between transactions
+
+
+def ft81x_header(addr, write):
+    return bytes((((addr >> 16) & 0x3F) | (0x80 if write else 0), (addr >> 8) & 0xFF, addr & 0xFF))
+
+
+def bt82x_header(addr, write):
+    return ((addr & 0x7FFFFFFF) | (0x80000000 if write else 0)).to_bytes(4, 'big')
+
+
+def ft81x_read(addr, value):
+    mosi = ft81x_header(addr, False) + bytes(5)
+    miso = bytes(4) + value.to_bytes(4, 'little')
+    return mosi, miso
+
+
+def bt82x_read(addr, value, wait=2):
+    # the sync byte 0x01 follows after a number of wait bytes
+    mosi = bt82x_header(addr, False) + bytes(wait + 5)
+    miso = bytes(4 + wait) + b'\x01' + value.to_bytes(4, 'little')
+    return mosi, miso
+
+
+PROFILES = {
+    "EmbeddedVideoEngine": {
+        "header": ft81x_header,
+        "read": ft81x_read,
+        "REG_CMD_READ": 0x3020F8,
+        "REG_CMDB_SPACE": 0x302574,
+        "REG_CMDB_WRITE": 0x302578,
+        "RAM_DL": 0x300000,
+        "REG_BOOT_STATUS": None,
+        "host": (bytes((0x44, 0x00, 0x00)), bytes((0x68, 0x00, 0x00))),
+    },
+    "EmbeddedVideoEngine5": {
+        "header": bt82x_header,
+        "read": bt82x_read,
+        "REG_CMD_READ": 0x7F00614C,
+        "REG_CMDB_SPACE": 0x7F006594,
+        "REG_CMDB_WRITE": 0x7F010000,
+        "RAM_DL": 0x7F008000,
+        "REG_BOOT_STATUS": 0x7F80044C,
+        "host": (bytes((0xFF, 0xE6, 0x00, 0x00, 0x00)), bytes((0xFF, 0xE2, 0x00, 0x00, 0x00))),
+    },
+}
+
+
+def copro_stream(module, size):
+    """
+    Returns size bytes of a typical co-processor command stream: a screen with text, a button and points.
+    """
+    opcodes = {name: opcode for opcode, name in module.COPRO_COMMANDS.items()}
+
+    def cmd(name, *args):
+        return struct.pack(f'<{1 + len(args)}I', opcodes[name], *args)
+
+    def string(text):
+        text = text.encode() + b'\0'
+        return text + bytes(-len(text) & 3)
+
+    screen = b''.join((
+        cmd("CMD_DLSTART"),
+        struct.pack('<I', 0x02000000),  # CLEAR_COLOR_RGB
+        struct.pack('<I', 0x26000007),  # CLEAR
+        cmd("CMD_FGCOLOR", 0x003870),
+        cmd("CMD_TEXT", (10 << 16) | 10, 28) + string("Hello world"),
+        cmd("CMD_BUTTON", (40 << 16) | 20, (30 << 16) | 120, 27) + string("Start"),
+        cmd("CMD_NUMBER", (80 << 16) | 200, 26, 12345),
+        struct.pack('<I', 0x04FF0000),  # COLOR_RGB
+        struct.pack('<I', 0x1F000002),  # BEGIN(POINTS)
+        struct.pack('<4I', 0x40000000 | (100 << 15) | 100, 0x40000000 | (200 << 15) | 100,
+                    0x40000000 | (100 << 15) | 200, 0x40000000 | (200 << 15) | 200),
+        struct.pack('<I', 0x21000000),  # END
+        struct.pack('<I', 0x00000000),  # DISPLAY
+        cmd("CMD_SWAP"),
+    ))
+
+    return (screen * (size // len(screen) + 1))[:size]
+
+
+def transactions(extension, kind, count):
+    """
+    Returns a list of (mosi, miso) transactions of one kind.
+    """
+    profile = PROFILES[extension]
+    header = profile["header"]
+    read = profile["read"]
+
+    if kind == "reg-poll":
+        polls = (read(profile["REG_CMD_READ"], 0x0FF0), read(profile["REG_CMDB_SPACE"], 0x0FFC))
+        return [polls[i & 1] for i in range(count)]
+
+    if kind == "cmdb-burst":
+        module = sys.modules[extension]
+        stream = copro_stream(module, 4096 * 7)
+        bursts = [header(profile["REG_CMDB_WRITE"], True) + stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+        return [(bursts[i % len(bursts)], bytes(len(bursts[i % len(bursts)]))) for i in range(count)]
+
+    if kind == "ram-dl":
+        words = struct.pack('<4I', 0x04FF0000, 0x1F000001, 0x40000000 | (10 << 15) | 20, 0x21000000) * 256
+        mosi = header(profile["RAM_DL"], True) + words
+        return [(mosi, bytes(len(mosi)))] * count
+
+    if kind == "ram-g-bulk":
+        data = bytes(range(256)) * 16
+        bursts = [header(0x1000 + i * 4096, True) + data for i in range(64)]
+        return [(bursts[i & 63], bytes(len(bursts[i & 63]))) for i in range(count)]
+
+    if kind == "host-command":
+        host = profile["host"]
+        return [(host[i & 1], bytes(len(host[i & 1]))) for i in range(count)]
+
+    if kind == "boot-status":
+        return [read(profile["REG_BOOT_STATUS"], 0x522E2E2E)] * count
+
+    raise ValueError(f"unknown transaction type '{kind}'")
+
+
+def kinds(extension):
+    result = ["reg-poll", "cmdb-burst", "ram-dl", "ram-g-bulk", "host-command"]
+    if PROFILES[extension]["REG_BOOT_STATUS"] is not None:
+        result.append("boot-status")
+    return result
+
+
+def spi_frames(txs):
+    """
+    Converts (mosi, miso) transactions to the frames of the Logic 2 SPI analyzer.
+    """
+    frames = []
+    t = 0.0
+    for mosi, miso in txs:
+        frames.append(AnalyzerFrame('enable', t, t))
+        for mosi_byte, miso_byte in zip(mosi, miso):
+            frames.append(AnalyzerFrame('result', t, t + BYTE_TIME, {
+                'mosi': bytes((mosi_byte,)), 'miso': bytes((miso_byte,))
+            }))
+            t += BYTE_TIME
+        frames.append(AnalyzerFrame('disable', t, t))
+        t += GAP_TIME
+    return frames
+
+
+def measure(extension, kind, count, settings=None):
+    """
+    Decodes count transactions of one kind and returns the measurements.
+    """
+    txs = transactions(extension, kind, count)
+    frames = spi_frames(txs)
+    spi_bytes = sum(len(mosi) for mosi, _ in txs)
+
+    # throughput
+    hla = load_analyzer(extension, settings)
+    decode = hla.decode
+    gc.collect()
+    clock = time.perf_counter
+    started = clock()
+    for frame in frames:
+        decode(frame)
+    elapsed = clock() - started
+
+    # latency of the 'disable' frames
+    hla = load_analyzer(extension, settings)
+    decode = hla.decode
+    clock_ns = time.perf_counter_ns
+    latencies = []
+    for frame in frames:
+        if frame.type == 'disable':
+            started = clock_ns()
+            decode(frame)
+            latencies.append(clock_ns() - started)
+        else:
+            decode(frame)
+    latencies.sort()
+
+    # memory
+    hla = load_analyzer(extension, settings)
+    decode = hla.decode
+    gc.collect()
+    tracemalloc.start()
+    for frame in frames:
+        decode(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # memory blocks, sampled after every decode call
+    hla = load_analyzer(extension, settings)
+    churn, retained = count_blocks(hla.decode, frames)
+    idle_churn, idle_retained = count_blocks(lambda frame: None, frames)
+
+    return {
+        "transactions": count,
+        "bytes": spi_bytes,
+        "seconds": elapsed,
+        "transactions_per_s": count / elapsed,
+        "bytes_per_s": spi_bytes / elapsed,
+        "disable_p50_us": latencies[len(latencies) // 2] / 1000,
+        "disable_p99_us": latencies[len(latencies) * 99 // 100] / 1000,
+        "peak_kb": peak / 1024,
+        "churn_blocks_per_transaction": max(churn - idle_churn, 0) / count,
+        "retained_blocks_per_transaction": (retained - idle_retained) / count,
+    }
+
+
+def count_blocks(decode, frames):
+    """
+    Runs the frames through decode and samples sys.getallocatedblocks() after every call.
+    Returns the sum of the increases, the blocks allocated in one call and freed in a later one like the
+    per-byte objects of a transaction, and the net change, the blocks still allocated at the end.
+    Temporaries allocated and freed within one call do not show up.
+    """
+    getallocatedblocks = sys.getallocatedblocks
+    gc.collect()
+    gc.disable()
+    try:
+        start = previous = getallocatedblocks()
+        churn = 0
+        for frame in frames:
+            decode(frame)
+            current = getallocatedblocks()
+            if current > previous:
+                churn += current - previous
+            previous = current
+    finally:
+        gc.enable()
+    gc.collect()
+    return churn, getallocatedblocks() - start
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the list of measurements whose throughput dropped by more than tolerance against the baseline.
+    """
+    regressions = []
+    for extension, measurements in results.items():
+        for kind, result in measurements.items():
+            reference = baseline.get(extension, {}).get(kind)
+            if reference and result["bytes_per_s"] < reference["bytes_per_s"] * (1 - tolerance):
+                regressions.append(f"{extension} {kind}: {result['bytes_per_s']:,.0f} bytes/s, "
+                                   f"baseline {reference['bytes_per_s']:,.0f} bytes/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measures decoder throughput per transaction type.")
+    parser.add_argument("-e", "--extension", choices=EXTENSIONS, action="append", help="default is all extensions")
+    parser.add_argument("-k", "--kind", action="append", help="transaction type, default is all types")
+    parser.add_argument("-n", "--count", type=int, default=2000, help="transactions per type, bursts use count / 50")
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="NAME=VALUE", help="analyzer setting")
+    parser.add_argument("--json", metavar="FILE", help="write the results to a JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="JSON file with baseline results, fails on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop against the baseline")
+    args = parser.parse_args(argv)
+
+    settings = dict(pair.split("=", 1) for pair in args.set)
+    results = {}
+
+    print(f"{'transaction type':<16} {'count':>6} {'bytes':>9} {'trans/s':>10} {'MB/s':>7} "
+          f"{'p50 us':>8} {'p99 us':>8} {'peak kB':>8} {'churn':>7} {'kept':>7}")
+
+    for extension in args.extension or EXTENSIONS:
+        load_analyzer(extension, settings)
+        print(extension)
+        results[extension] = {}
+        for kind in args.kind or kinds(extension):
+            count = args.count if kind in ("reg-poll", "host-command", "boot-status") else max(1, args.count // 50)
+            result = measure(extension, kind, count, settings)
+            results[extension][kind] = result
+            print(f"  {kind:<14} {count:>6} {result['bytes']:>9} {result['transactions_per_s']:>10,.0f} "
+                  f"{result['bytes_per_s'] / 1e6:>7.2f} {result['disable_p50_us']:>8.1f} {result['disable_p99_us']:>8.1f} "
+                  f"{result['peak_kb']:>8.1f} {result['churn_blocks_per_transaction']:>7.2f} "
+                  f"{result['retained_blocks_per_transaction']:>7.2f}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
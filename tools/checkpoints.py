@@ -0,0 +1,106 @@
+# Checkpoints of the decoder state for mapped trace files, to decode a time range without the whole capture
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# A decode of a mapped trace file with --checkpoints N stores the state of the analyzer (co-processor parser,
+# display list shadow, FIFO model, pending poll and write runs, counters, RAM_G shadow) every N transactions in a JSON file
+# next to the trace. A later decode with --start continues from the last checkpoint before the start time and
+# only outputs the frames from there on, so a glitch at minute 47 does not need the 46 minutes before it.
+# Checkpoints belong to the analyzer and the settings they were taken with, inside a zlib stream of CMD_INFLATE
+# the state can not be stored and the checkpoint is taken after the next transaction.
+
+import bisect
+import json
+import os
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(path):
+    return path + ".checkpoints"
+
+
+def checked_settings(settings):
+    # the export directory does not change the state
+    return {name: value for name, value in settings.items() if name != "export"}
+
+
+def checkpointed(trace, hla, interval, checkpoints):
+    """
+    Yields the frames of all transactions of a mapped trace and appends a checkpoint to checkpoints
+    about every interval transactions, the state is taken after the analyzer decoded the 'disable' frame.
+    """
+    number = 0
+    due = interval
+    for frame in trace.frames():
+        yield frame
+        if frame.type == "disable":
+            number += 1
+            if number >= due and number < len(trace):
+                state = hla.state()
+                if state is not None:
+                    checkpoints.append({"transaction": number, "time": frame.end_time, "state": state})
+                    due = number + interval
+
+
+def save_checkpoints(path, extension, settings, trace, interval, checkpoints):
+    with open(path, "w") as file:
+        json.dump({
+            "version": CHECKPOINT_VERSION,
+            "extension": extension,
+            "settings": checked_settings(settings),
+            "transactions": len(trace),
+            "interval": interval,
+            "checkpoints": checkpoints
+        }, file, separators=(",", ":"))
+
+
+def load_checkpoints(path, extension, settings, trace):
+    """
+    Returns the checkpoints stored for a trace or None if there are none for the analyzer and settings.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        stored = json.load(file)
+    if (stored.get("version") != CHECKPOINT_VERSION or stored["extension"] != extension
+            or stored["settings"] != checked_settings(settings) or stored["transactions"] != len(trace)):
+        return None
+    return stored["checkpoints"]
+
+
+def resume(trace, hla, checkpoints, start_time, end_time=None):
+    """
+    Restores the analyzer from the last checkpoint before start_time, returns the frames to decode from there
+    up to end_time. The frames the analyzer produces before start_time only rebuild its state.
+    """
+    first, last = trace.span(start_time, end_time)
+    numbers = [checkpoint["transaction"] for checkpoint in checkpoints]
+    index = bisect.bisect_right(numbers, first) - 1
+    begin = 0
+    if index >= 0:
+        hla.restore(checkpoints[index]["state"])
+        begin = numbers[index]
+    return trace.frames(begin, last)
@@ -0,0 +1,386 @@
+# Micro-benchmark for the decoding of the transaction headers
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+# Two measurements of the 256-entry header lookup tables of eve_core/profile.py:
+# the default one classifies 10M synthetic headers (kind and address) with the table of the profile and
+# int.from_bytes() and with a shift, mask and if chain, in the same process on the same bytes, so nothing else of
+# the decoder is timed. The kind alone is timed both ways as well, and the table with the keyword form of
+# int.from_bytes() of Profile.address(). All variants have to agree on the number of headers per kind and on the
+# sum of the addresses.
+# --end-to-end times Hla.decode of two revisions exported with git archive, each in its own process with its own
+# replay.py; without --baseline the commit that added the tables is searched with git log -S, which needs the full
+# history, and compared with its parent so the later commits are not part of the result.
+#
+# python tools/header_benchmark.py
+# python tools/header_benchmark.py -e EmbeddedVideoEngine5 --headers 1000000
+# python tools/header_benchmark.py --end-to-end --baseline <revision> --against <revision> --trace capture.trace
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+EXTENSIONS = ("EmbeddedVideoEngine", "EmbeddedVideoEngine5")
+
+
+def tables_commit():
+    """
+    Returns the commit that added the header lookup tables to eve_core/profile.py, searched in the history.
+    """
+    try:
+        commits = subprocess.run(["git", "log", "--format=%H", "--reverse", "-S", "header_kinds", "--",
+                                  "eve_core/profile.py"], cwd=REPO_DIR, check=True, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError) as error:
+        raise SystemExit(f"cannot search the history ({error}), give --baseline and --against")
+    first = commits.stdout.split()
+    if not first or subprocess.run(["git", "rev-parse", "--verify", "--quiet", first[0] + "^"], cwd=REPO_DIR,
+                                   capture_output=True).returncode:
+        raise SystemExit("the commit with the header lookup tables or its parent is not in this clone, "
+                         "give --baseline and --against")
+    return first[0]
+
+
+def header_samples(header_length, count, seed=1):
+    """
+    Returns count headers of random bytes as the engine collects them, so every class of first byte occurs.
+    """
+    size = header_length * count
+    stream = random.Random(seed).getrandbits(8 * size).to_bytes(size, byteorder='little')
+    return [bytearray(stream[start:start + header_length]) for start in range(0, size, header_length)]
+
+
+def iterate(profile, headers, rounds):
+    """
+    The loop of the other variants without the work, subtracted from their time.
+    """
+    for _ in range(rounds):
+        for mosi in headers:
+            mosi[0]
+    return None
+
+
+def classify_tables(profile, headers, rounds):
+    """
+    The current classification: one lookup in the table of the profile, the address with int.from_bytes().
+    """
+    kinds = profile.header_kinds
+    mask = profile.address_mask
+    counts = [0, 0, 0, 0]
+    total = 0
+    for _ in range(rounds):
+        for mosi in headers:
+            counts[kinds[mosi[0]]] += 1
+            total += int.from_bytes(mosi, 'big') & mask
+    return counts, total
+
+
+def classify_tables_keyword(profile, headers, rounds):
+    """
+    As classify_tables() with int.from_bytes(mosi, byteorder='big') as in Profile.address(), the keyword argument
+    is parsed on every call.
+    """
+    kinds = profile.header_kinds
+    mask = profile.address_mask
+    counts = [0, 0, 0, 0]
+    total = 0
+    for _ in range(rounds):
+        for mosi in headers:
+            counts[kinds[mosi[0]]] += 1
+            total += int.from_bytes(mosi, byteorder='big') & mask
+    return counts, total
+
+
+def classify_chain_ft81x(profile, headers, rounds):
+    """
+    The classification before the tables for FT81x: the top two bits tested one by one, the address shifted together.
+    """
+    from eve_core.profile import HEADER_HOST, HEADER_INVALID, HEADER_READ, HEADER_WRITE
+
+    counts = [0, 0, 0, 0]
+    total = 0
+    for _ in range(rounds):
+        for mosi in headers:
+            first = mosi[0]
+            if first & 0x80:
+                kind = HEADER_INVALID if first & 0x40 else HEADER_WRITE
+            elif first & 0x40:
+                kind = HEADER_HOST
+            else:
+                kind = HEADER_READ
+            counts[kind] += 1
+            total += (first << 16 | mosi[1] << 8 | mosi[2]) & 0x3FFFFF
+    return counts, total
+
+
+def classify_chain_bt82x(profile, headers, rounds):
+    """
+    The classification before the tables for BT82x: bit 7 selects write, the address shifted together.
+    """
+    from eve_core.profile import HEADER_READ, HEADER_WRITE
+
+    counts = [0, 0, 0, 0]
+    total = 0
+    for _ in range(rounds):
+        for mosi in headers:
+            first = mosi[0]
+            if first & 0x80:
+                kind = HEADER_WRITE
+            else:
+                kind = HEADER_READ
+            counts[kind] += 1
+            total += (first << 24 | mosi[1] << 16 | mosi[2] << 8 | mosi[3]) & 0x7FFFFFFF
+    return counts, total
+
+
+def kinds_tables(profile, headers, rounds):
+    """
+    Only the class of the first byte from the table of the profile.
+    """
+    kinds = profile.header_kinds
+    counts = [0, 0, 0, 0]
+    for _ in range(rounds):
+        for mosi in headers:
+            counts[kinds[mosi[0]]] += 1
+    return counts, None
+
+
+def kinds_chain_ft81x(profile, headers, rounds):
+    """
+    Only the class of the first byte from the FT81x if chain.
+    """
+    from eve_core.profile import HEADER_HOST, HEADER_INVALID, HEADER_READ, HEADER_WRITE
+
+    counts = [0, 0, 0, 0]
+    for _ in range(rounds):
+        for mosi in headers:
+            first = mosi[0]
+            if first & 0x80:
+                kind = HEADER_INVALID if first & 0x40 else HEADER_WRITE
+            elif first & 0x40:
+                kind = HEADER_HOST
+            else:
+                kind = HEADER_READ
+            counts[kind] += 1
+    return counts, None
+
+
+def kinds_chain_bt82x(profile, headers, rounds):
+    """
+    Only the class of the first byte from the BT82x bit test.
+    """
+    from eve_core.profile import HEADER_READ, HEADER_WRITE
+
+    counts = [0, 0, 0, 0]
+    for _ in range(rounds):
+        for mosi in headers:
+            if mosi[0] & 0x80:
+                kind = HEADER_WRITE
+            else:
+                kind = HEADER_READ
+            counts[kind] += 1
+    return counts, None
+
+
+CHAINS = {3: (classify_chain_ft81x, kinds_chain_ft81x), 4: (classify_chain_bt82x, kinds_chain_bt82x)}
+
+
+def micro_benchmark(extension, count, repeat):
+    """
+    Times the variants on count headers, at most 1M distinct ones decoded in rounds, prints one line each
+    with the time per header without the loop and the speedup over the if chain.
+    """
+    sys.path.insert(0, TOOLS_DIR)
+    from replay import load_analyzer
+
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    profile = load_analyzer(extension).profile
+    distinct = min(count, 1000000)
+    rounds = max(1, count // distinct)
+    headers = header_samples(profile.header_length, distinct)
+    chain, kinds_chain = CHAINS[profile.header_length]
+    variants = (("loop", iterate), ("if chain", chain), ("tables", classify_tables),
+                ("byteorder=", classify_tables_keyword), ("kind chain", kinds_chain), ("kind table", kinds_tables))
+    clock = time.perf_counter
+    timings = {}
+    reference = None
+    for name, function in variants:
+        best = None
+        for _ in range(repeat):
+            started = clock()
+            result = function(profile, headers, rounds)
+            elapsed = clock() - started
+            best = elapsed if best is None else min(best, elapsed)
+        if result is not None:
+            if reference is None:
+                reference = result
+            elif result[0] != reference[0] or result[1] not in (None, reference[1]):
+                raise SystemExit(f"{extension}: '{name}' disagrees with the other variants")
+        timings[name] = best
+
+    headers_total = distinct * rounds
+    loop = timings.pop("loop")
+    for name, seconds in timings.items():
+        net = seconds - loop
+        # the kind only variants are compared with the kind only chain
+        reference_name = "kind chain" if name.startswith("kind") else "if chain"
+        print(f"{extension:<22} {name:<11} {seconds:>8.3f} {net / headers_total * 1e9:>10.1f} "
+              f"{(timings[reference_name] - loop) / net:>7.2f}x")
+
+
+def export_revision(revision, directory):
+    """
+    Extracts the tree of a revision into directory.
+    """
+    archive = subprocess.run(["git", "archive", "--format=tar", revision], cwd=REPO_DIR, check=True,
+                             capture_output=True)
+    path = os.path.join(directory, "tree.tar")
+    with open(path, "wb") as file:
+        file.write(archive.stdout)
+    with tarfile.open(path) as tar:
+        tar.extractall(directory)
+    os.remove(path)
+
+
+def write_mixed_trace(extension, path, count):
+    """
+    Writes a trace with the transaction types of tools/benchmark.py interleaved, returns the number of transactions.
+    """
+    sys.path.insert(0, TOOLS_DIR)
+    import benchmark
+    from replay import load_analyzer, write_trace
+
+    load_analyzer(extension)  # benchmark.py builds the command stream from the extension module
+    streams = []
+    for kind in benchmark.kinds(extension):
+        short = kind in ("reg-poll", "host-command", "boot-status")
+        streams.append(benchmark.transactions(extension, kind, count if short else max(1, count // 50)))
+    txs = [tx for group in itertools.zip_longest(*streams) for tx in group if tx is not None]
+    write_trace(path, benchmark.spi_frames(txs))
+    return len(txs)
+
+
+def worker(root, extension, trace, repeat):
+    """
+    Runs in its own process: times Hla.decode of the tree in root on the frames of the trace, prints JSON.
+    """
+    sys.path.insert(0, os.path.join(root, "tools"))
+    from replay import load_analyzer, read_trace
+
+    frames = list(read_trace(trace))
+    clock = time.perf_counter
+    best = None
+    output = 0
+    for _ in range(repeat):
+        decode = load_analyzer(extension).decode
+        output = 0
+        started = clock()
+        for frame in frames:
+            if decode(frame) is not None:
+                output += 1
+        elapsed = clock() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(json.dumps({"seconds": best, "frames": len(frames), "results": output}))
+
+
+def run_worker(root, extension, trace, repeat):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", root, "-e", extension,
+                             "--trace", trace, "--repeat", str(repeat)], check=True, capture_output=True, text=True)
+    return json.loads(result.stdout)
+
+
+def end_to_end(args):
+    """
+    Times Hla.decode of the baseline revision and of --against or the working tree on the same traces.
+    """
+    if args.baseline:
+        revision, against = args.baseline, args.against
+    else:
+        against = args.against or tables_commit()
+        revision = against + "^"
+    print(f"baseline {revision}, current {against or 'working tree'}")
+    print(f"{'extension':<22} {'variant':<10} {'seconds':>8} {'Mframes/s':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory(prefix="eve_header_") as directory:
+        baseline_root = os.path.join(directory, "baseline")
+        os.mkdir(baseline_root)
+        export_revision(revision, baseline_root)
+        current_root = REPO_DIR
+        if against:
+            current_root = os.path.join(directory, "current")
+            os.mkdir(current_root)
+            export_revision(against, current_root)
+
+        for extension in args.extension or EXTENSIONS:
+            trace = args.trace
+            if trace is None:
+                trace = os.path.join(directory, extension + ".trace")
+                write_mixed_trace(extension, trace, args.count)
+
+            reference = None
+            for name, root in (("baseline", baseline_root), ("current", current_root)):
+                result = run_worker(root, extension, trace, args.repeat)
+                seconds = result["seconds"]
+                reference = reference or seconds
+                print(f"{extension:<22} {name:<10} {seconds:>8.3f} {result['frames'] / seconds / 1e6:>10.2f} "
+                      f"{reference / seconds:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measures the header lookup tables against the code before them.")
+    parser.add_argument("-e", "--extension", choices=EXTENSIONS, action="append", help="default is all extensions")
+    parser.add_argument("--headers", type=int, default=10000000, help="headers classified per variant")
+    parser.add_argument("--end-to-end", action="store_true", help="time Hla.decode of two revisions instead")
+    parser.add_argument("-n", "--count", type=int, default=20000,
+                        help="--end-to-end: short transactions per type, bursts use count / 50")
+    parser.add_argument("--trace", help="--end-to-end: binary trace file to decode instead of the mixed traffic")
+    parser.add_argument("--baseline", help="--end-to-end: revision to compare with, default is the parent of the "
+                                           "commit that added the lookup tables")
+    parser.add_argument("--against", help="--end-to-end: revision to measure, default is the commit that added the "
+                                          "lookup tables, or the working tree with --baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per variant, the fastest one counts")
+    parser.add_argument("--worker", metavar="ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.extension[0], args.trace, args.repeat)
+    elif args.end_to_end:
+        end_to_end(args)
+    else:
+        print(f"{'extension':<22} {'variant':<11} {'seconds':>8} {'ns/header':>10} {'speedup':>8}")
+        for extension in args.extension or EXTENSIONS:
+            micro_benchmark(extension, args.headers, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
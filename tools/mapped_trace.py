@@ -0,0 +1,314 @@
+# Memory-mapped trace files with fixed-width transaction records and a time index
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Layout, all little-endian and every section 8-byte aligned:
+#   magic, header (transactions, SPI bytes, index step and the offsets of the sections)
+#   records: one per transaction, start and end time, start of the first byte, byte period and byte duration,
+#            offset into the byte heaps, the number of bytes and the position of its byte times or NO_TIMES
+#   MOSI heap and MISO heap: the bytes of all transactions back to back, both use the offset of the record
+#   times heap: start and end time of every byte, only for the transactions in which the bytes are not evenly
+#               spaced, the others get the byte times from the record, the engine needs them for the frames
+#   index: start time of every index step-th transaction, small enough to be read completely
+# The file is mapped and the frames for Hla are built on demand, so opening it takes no time whatever its size
+# and a time range is found with a bisect in the index and in the records of one step.
+
+import bisect
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+try:
+    import saleae.analyzers  # noqa: F401
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from saleae.analyzers import AnalyzerFrame
+
+MAPPED_MAGIC = b"EVEMAP2\n"
+MAPPED_HEADER = struct.Struct("<QQQQQQQQ")
+MAPPED_RECORD = struct.Struct("<dddddQQQ")
+BYTE_TIMES = struct.Struct("<dd")
+INDEX_STEP = 1024
+NO_TIMES = (1 << 64) - 1
+TIME_TOLERANCE = 1e-12  # byte times rebuilt from the record are this close, far below any sample period
+
+
+def align(file):
+    """
+    Pads the file to the next multiple of 8 bytes, returns the offset.
+    """
+    offset = file.tell()
+    if offset & 7:
+        file.write(bytes(8 - (offset & 7)))
+        offset = file.tell()
+    return offset
+
+
+def byte_timing(starts, ends):
+    """
+    Returns (first start, period, duration) if the byte times are rebuilt from them to within TIME_TOLERANCE,
+    None if the bytes need their own times.
+    """
+    if not starts:
+        return 0.0, 0.0, 0.0
+    first = starts[0]
+    duration = ends[0] - first
+    period = (starts[-1] - first) / (len(starts) - 1) if len(starts) > 1 else 0.0
+    for position, (start, end) in enumerate(zip(starts, ends)):
+        byte_start = first + position * period
+        if abs(byte_start - start) > TIME_TOLERANCE or abs(byte_start + duration - end) > TIME_TOLERANCE:
+            return None
+    return first, period, duration
+
+
+def write_mapped(path, frames, index_step=INDEX_STEP):
+    """
+    Writes the enable/result/disable frames of a capture to a mapped trace file, returns the number of transactions.
+    Result frames outside of a transaction are dropped, a transaction without 'disable' ends with its last byte.
+    """
+    pack_record = MAPPED_RECORD.pack
+    pack_times = BYTE_TIMES.pack
+    index = array("d")
+    starts = array("d")
+    ends = array("d")
+    count = 0
+    offset = 0
+    explicit = 0
+    start_time = None
+    end_time = None
+
+    with open(path, "wb") as file, tempfile.TemporaryFile() as mosi_heap, \
+            tempfile.TemporaryFile() as miso_heap, tempfile.TemporaryFile() as times_heap:
+        file.write(MAPPED_MAGIC)
+        file.write(bytes(MAPPED_HEADER.size))
+        records_offset = file.tell()
+
+        def close():
+            nonlocal count, offset, explicit
+            if count % index_step == 0:
+                index.append(start_time)
+            length = len(starts)
+            timing = byte_timing(starts, ends)
+            if timing is None:
+                file.write(pack_record(start_time, end_time, 0.0, 0.0, 0.0, offset, length, explicit))
+                for byte_times in zip(starts, ends):
+                    times_heap.write(pack_times(*byte_times))
+                explicit += length
+            else:
+                file.write(pack_record(start_time, end_time, *timing, offset, length, NO_TIMES))
+            count += 1
+            offset += length
+            del starts[:]
+            del ends[:]
+
+        for frame in frames:
+            kind = frame.type
+            if kind == "result":
+                if start_time is None:
+                    continue
+                mosi_heap.write(frame.data.get("mosi", b"\0")[:1])
+                miso_heap.write(frame.data.get("miso", b"\0")[:1])
+                starts.append(frame.start_time)
+                ends.append(frame.end_time)
+                end_time = frame.end_time
+            elif kind == "enable":
+                if start_time is not None:
+                    close()
+                start_time = end_time = frame.start_time
+            elif kind == "disable" and start_time is not None:
+                end_time = frame.end_time
+                close()
+                start_time = None
+        if start_time is not None:
+            close()
+
+        sections = []
+        for heap in (mosi_heap, miso_heap, times_heap):
+            sections.append(align(file))
+            heap.seek(0)
+            while True:
+                chunk = heap.read(1 << 20)
+                if not chunk:
+                    break
+                file.write(chunk)
+        sections.append(align(file))
+        index.tofile(file)
+
+        file.seek(len(MAPPED_MAGIC))
+        file.write(MAPPED_HEADER.pack(count, offset, index_step, records_offset, *sections))
+
+    return count
+
+
+def is_mapped(path):
+    with open(path, "rb") as file:
+        return file.read(len(MAPPED_MAGIC)) == MAPPED_MAGIC
+
+
+class MappedTrace:
+    """
+    A mapped trace file, transactions are addressed by their number.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            if file.read(len(MAPPED_MAGIC)) != MAPPED_MAGIC:
+                raise ValueError(f"{path} is not a mapped trace file")
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (self.count, self.spi_bytes, self.index_step, self.records_offset, self.mosi_offset, self.miso_offset,
+         self.times_offset, index_offset) = MAPPED_HEADER.unpack_from(self.map, len(MAPPED_MAGIC))
+        self.index = array("d", self.map[index_offset:index_offset + 8 * -(-self.count // self.index_step)])
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.map.close()
+
+    def record(self, number):
+        """
+        Returns (start time, end time, first byte start, byte period, byte duration, heap offset, length,
+        byte times position or NO_TIMES) of a transaction.
+        """
+        return MAPPED_RECORD.unpack_from(self.map, self.records_offset + number * MAPPED_RECORD.size)
+
+    def find(self, time):
+        """
+        Returns the number of the first transaction that ends at or after time, len(self) if there is none.
+        """
+        step = self.index_step
+        block = max(bisect.bisect_right(self.index, time) - 1, 0)
+        first = block * step
+        last = min(first + step, self.count)
+        while first < last:
+            middle = (first + last) // 2
+            if self.record(middle)[1] < time:
+                first = middle + 1
+            else:
+                last = middle
+        return first
+
+    def frames(self, first=0, last=None):
+        """
+        Yields the enable/result/disable frames of the transactions first up to but not including last.
+        """
+        last = self.count if last is None else min(last, self.count)
+        data = self.map
+        unpack_record = MAPPED_RECORD.unpack_from
+        unpack_times = BYTE_TIMES.unpack_from
+        record_size = MAPPED_RECORD.size
+        records_offset = self.records_offset
+        mosi_offset = self.mosi_offset
+        miso_offset = self.miso_offset
+        times_offset = self.times_offset
+
+        for number in range(first, last):
+            (start_time, end_time, first_start, period, duration, offset, length,
+             times) = unpack_record(data, records_offset + number * record_size)
+            yield AnalyzerFrame("enable", start_time, start_time, {})
+            mosi = data[mosi_offset + offset:mosi_offset + offset + length]
+            miso = data[miso_offset + offset:miso_offset + offset + length]
+            if times == NO_TIMES:
+                for position in range(length):
+                    byte_start = first_start + position * period
+                    yield AnalyzerFrame("result", byte_start, byte_start + duration,
+                                        {"mosi": mosi[position:position + 1], "miso": miso[position:position + 1]})
+            else:
+                times = times_offset + 16 * times
+                for position in range(length):
+                    byte_start, byte_end = unpack_times(data, times + 16 * position)
+                    yield AnalyzerFrame("result", byte_start, byte_end,
+                                        {"mosi": mosi[position:position + 1], "miso": miso[position:position + 1]})
+            yield AnalyzerFrame("disable", end_time, end_time, {})
+
+    def transactions(self, first=0, last=None):
+        """
+        Yields (start time, MOSI bytes, MISO bytes, end time, byte_time) for the transactions first up to but
+        not including last, byte_time(position) returns the start and end time of a byte.
+        """
+        last = self.count if last is None else min(last, self.count)
+        data = self.map
+        unpack_record = MAPPED_RECORD.unpack_from
+        unpack_times = BYTE_TIMES.unpack_from
+        record_size = MAPPED_RECORD.size
+        records_offset = self.records_offset
+        mosi_offset = self.mosi_offset
+        miso_offset = self.miso_offset
+        times_offset = self.times_offset
+
+        def even(first_start, period, duration):
+            def byte_time(position):
+                byte_start = first_start + position * period
+                return byte_start, byte_start + duration
+            return byte_time
+
+        def listed(times):
+            def byte_time(position):
+                return unpack_times(data, times + 16 * position)
+            return byte_time
+
+        for number in range(first, last):
+            (start_time, end_time, first_start, period, duration, offset, length,
+             times) = unpack_record(data, records_offset + number * record_size)
+            mosi = data[mosi_offset + offset:mosi_offset + offset + length]
+            miso = data[miso_offset + offset:miso_offset + offset + length]
+            if times == NO_TIMES:
+                yield start_time, mosi, miso, end_time, even(first_start, period, duration)
+            else:
+                yield start_time, mosi, miso, end_time, listed(times_offset + 16 * times)
+
+    def range(self, start_time=None, end_time=None):
+        """
+        Yields the frames of the transactions that overlap start_time to end_time, None is open ended.
+        """
+        return self.frames(*self.span(start_time, end_time))
+
+    def span(self, start_time=None, end_time=None):
+        """
+        Returns the numbers of the first transaction that overlaps start_time to end_time and of the one after the last.
+        """
+        first = 0 if start_time is None else self.find(start_time)
+        last = self.count
+        if end_time is not None:
+            block = bisect.bisect_right(self.index, end_time)
+            lower = max(block - 1, 0) * self.index_step
+            last = min(block * self.index_step, self.count)
+            while lower < last:
+                middle = (lower + last) // 2
+                if self.record(middle)[0] <= end_time:
+                    lower = middle + 1
+                else:
+                    last = middle
+        return first, max(first, last)
@@ -0,0 +1,190 @@
+# Parallel replay of recorded captures, sharded at chip-select boundaries
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Decodes a mapped trace file (replay.py --map) with Hla on a process pool. The capture is split into shards
+# of about the same number of transactions, the start state of every shard comes from a pre-pass with
+# Engine.skim() that takes the transactions into the state of the analyzer (co-processor parser, display list
+# shadow, FIFO model, pending poll and write runs, RAM_G shadow, counters) without making any frames and several
+# times faster than the decode. Every worker restores the state its shard starts with and decodes exactly the
+# transactions of its shard through the map, the last shard adds the frames of Hla.finish(). The shards are
+# handed to the workers while the pre-pass goes on, the frames are the ones of the sequential replay in the
+# same order, --check compares both.
+# A shard starts at a transaction with bytes and not inside a zlib stream of CMD_INFLATE, where the state can
+# not be taken. The 'Frames' mode has no state to take and the columnar export is written by one analyzer only,
+# both are not supported.
+#
+# python tools/parallel_replay.py -e EmbeddedVideoEngine5 capture.map -o frames.jsonl -j 32
+# python tools/parallel_replay.py -e EmbeddedVideoEngine5 capture.map --check
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TOOLS_DIR)
+
+from mapped_trace import MappedTrace, is_mapped  # noqa: E402
+from replay import EXTENSIONS, Replay, frame_dict, load_analyzer, parse_settings  # noqa: E402
+
+
+def shards(extension, settings, path, count):
+    """
+    Yields the jobs for decode_shard(), (extension, settings, path, start state or None, first transaction,
+    transaction after the last, last shard), the states come from a pre-pass with Engine.skim().
+    """
+    hla = load_analyzer(extension, settings)
+    skim = hla.skim
+    with MappedTrace(path) as trace:
+        transactions = len(trace)
+        boundary = 1
+        state = None
+        first = 0
+        for number, transaction in enumerate(trace.transactions()):
+            if number * count >= transactions * boundary and transaction[1]:
+                start = hla.state()
+                if start is not None:
+                    yield extension, settings, path, state, first, number, False
+                    state = start
+                    first = number
+                    while number * count >= transactions * boundary:
+                        boundary += 1
+            skim(*transaction)
+    yield extension, settings, path, state, first, transactions, True
+
+
+def decode_shard(job):
+    """
+    Decodes one shard in a worker process, returns the records of the frames the analyzer produced for it.
+    """
+    extension, settings, path, state, first, last, final = job
+    hla = load_analyzer(extension, settings)
+    if state is not None:
+        hla.restore(state)
+    decode = hla.decode
+    records = []
+
+    with MappedTrace(path) as trace:
+        for frame in trace.frames(first, last):
+            result = decode(frame)
+            if result is None:
+                continue
+            if isinstance(result, list):
+                records.extend(frame_dict(frame) for frame in result)
+            else:
+                records.append(frame_dict(result))
+
+    finish = getattr(hla, "finish", None)
+    if final and finish is not None:
+        records.extend(frame_dict(frame) for frame in finish())
+    return records
+
+
+def decode_parallel(extension, settings, path, jobs, shard_count=None):
+    """
+    Decodes a mapped trace file on a process pool, returns the frame records in time order.
+    """
+    if settings.get("export"):
+        raise ValueError("parallel replay does not support the columnar export")
+    load_analyzer(extension, settings).state()  # checks the settings before the workers start
+
+    with multiprocessing.Pool(jobs) as pool:
+        results = pool.imap(decode_shard, shards(extension, settings, path, shard_count or jobs * 4), chunksize=1)
+        return [record for records in results for record in records]
+
+
+def decode_sequential(extension, settings, path):
+    """
+    Decodes a mapped trace file in one process.
+    """
+    replay = Replay(load_analyzer(extension, settings))
+    with MappedTrace(path) as trace:
+        return [frame_dict(frame) for frame in replay.run(trace.frames())]
+
+
+def differences(records, reference):
+    """
+    Returns the number of records that differ.
+    """
+    count = abs(len(records) - len(reference))
+    for record, expected in zip(records, reference):
+        if record != expected:
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replays a mapped trace file on a process pool.")
+    parser.add_argument("capture", help="mapped trace file, see replay.py --map")
+    parser.add_argument("-e", "--extension", choices=EXTENSIONS, default="EmbeddedVideoEngine5")
+    parser.add_argument("-o", "--output", help="JSONL output file, default is stdout")
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="NAME=VALUE", help="analyzer setting")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--shards", type=int, help="number of shards, default is 4 per worker")
+    parser.add_argument("--check", action="store_true", help="decode sequentially as well and compare")
+    args = parser.parse_args(argv)
+
+    if not is_mapped(args.capture):
+        print(f"{args.capture} is not a mapped trace file, convert it with replay.py --map", file=sys.stderr)
+        return 2
+
+    settings = parse_settings(args.set)
+    clock = time.perf_counter
+    started = clock()
+    try:
+        records = decode_parallel(args.extension, settings, args.capture, args.jobs, args.shards)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    elapsed = clock() - started
+    print(f"{len(records)} frames in {elapsed:.3f} s with {args.jobs} workers", file=sys.stderr)
+
+    if args.check:
+        started = clock()
+        reference = decode_sequential(args.extension, settings, args.capture)
+        print(f"sequential: {len(reference)} frames in {clock() - started:.3f} s", file=sys.stderr)
+        count = differences(records, reference)
+        if count:
+            print(f"{count} frames differ from the sequential replay", file=sys.stderr)
+            return 1
+        print("identical to the sequential replay", file=sys.stderr)
+        return 0
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in records:
+            output.write(json.dumps(record, default=lambda value: value.hex()))
+            output.write("\n")
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# Offline replay of SPI captures through the High Level Analyzers of this repository
+#@version 1.0
+#@date    2026-10-18
+#@author  Rudolph Riedel
+
+#MIT License
+#
+#Copyright (c) 2016-2026 Rudolph Riedel
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy of
+#this software and associated documentation files (the "Software"), to deal in
+#the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense,
+#and/or sell copies of the Software, and to permit persons to whom the Software
+#is furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+#FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+#COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+#IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+#CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# Feeds the enable/result/disable frames of a Saleae SPI export (CSV) or of a binary trace file
+# into EmbeddedVideoEngine.Hla or EmbeddedVideoEngine5.Hla and writes the frames they produce as CSV or JSONL.
+#
+# python tools/replay.py -e EmbeddedVideoEngine5 capture.csv -o frames.jsonl
+# python tools/replay.py -e EmbeddedVideoEngine capture.csv --convert capture.trace
+# python tools/replay.py -e EmbeddedVideoEngine5 capture.trace --export columns -q > /dev/null
+# python tools/replay.py -e EmbeddedVideoEngine5 capture.csv --map capture.map
+# python tools/replay.py -e EmbeddedVideoEngine5 capture.map --checkpoints 10000 -q > /dev/null
+# python tools/replay.py -e EmbeddedVideoEngine5 capture.map --start 47.5 --end 47.6
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import struct
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+
+try:
+    import saleae.analyzers  # noqa: F401
+except ImportError:
+    sys.path.insert(0, TOOLS_DIR)
+
+from saleae.analyzers import AnalyzerFrame, Setting
+
+from checkpoints import checkpoint_path, checkpointed, load_checkpoints, resume, save_checkpoints  # noqa: E402
+from mapped_trace import MappedTrace, is_mapped, write_mapped  # noqa: E402
+
+EXTENSIONS = ("EmbeddedVideoEngine", "EmbeddedVideoEngine5")
+
+# binary trace: magic, then one record per frame
+# kind (0 = enable, 1 = result, 2 = disable), start and end time in seconds, MOSI and MISO byte for results
+TRACE_MAGIC = b"EVETRC1\n"
+TRACE_RECORD = struct.Struct("<Bdd")
+TRACE_KINDS = ("enable", "result", "disable")
+
+
+def load_analyzer(extension, settings=None):
+    """
+    Imports the extension and returns an Hla instance, with settings applied the way Logic 2 does it:
+    setting attributes are assigned before __init__ is called, missing ones get the default value.
+    """
+    if extension not in EXTENSIONS:
+        raise ValueError(f"unknown extension '{extension}', choose from {', '.join(EXTENSIONS)}")
+
+    extension_dir = os.path.join(REPO_DIR, extension)
+    if extension_dir not in sys.path:
+        sys.path.insert(0, extension_dir)
+    cls = importlib.import_module(extension).Hla
+
+    settings = dict(settings or {})
+    hla = cls.__new__(cls)
+    for name in dir(cls):
+        setting = getattr(cls, name)
+        if isinstance(setting, Setting):
+            value = settings.pop(name, setting.default())
+            if hasattr(setting, "min_value") and isinstance(value, str):
+                value = float(value)
+            setattr(hla, name, value)
+
+    if settings:
+        raise ValueError(f"unknown settings: {', '.join(settings)}")
+
+    hla.__init__()
+    return hla
+
+
+def read_csv(path):
+    """
+    Yields the frames of a Logic 2 SPI analyzer export.
+    """
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower().replace(" ", "_") for column in next(reader)]
+        type_index = header.index("type")
+        start_index = header.index("start_time")
+        duration_index = header.index("duration")
+        mosi_index = header.index("mosi")
+        miso_index = header.index("miso")
+
+        for row in reader:
+            if len(row) < len(header):
+                row += [""] * (len(header) - len(row))
+            start_time = float(row[start_index])
+            end_time = start_time + float(row[duration_index] or 0)
+            data = {}
+            if row[mosi_index]:
+                data["mosi"] = bytes((int(row[mosi_index], 0),))
+            if row[miso_index]:
+                data["miso"] = bytes((int(row[miso_index], 0),))
+            yield AnalyzerFrame(row[type_index], start_time, end_time, data)
+
+
+def read_trace(path, offset=0):
+    """
+    Yields the frames of a binary trace file, from offset bytes after the magic on.
+    """
+    record_size = TRACE_RECORD.size
+    unpack_from = TRACE_RECORD.unpack_from
+
+    with open(path, "rb") as file:
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        file.seek(offset, os.SEEK_CUR)
+        buffer = file.read()
+
+    pos = 0
+    while pos < len(buffer):
+        kind, start_time, end_time = unpack_from(buffer, pos)
+        pos += record_size
+        if kind == 1:
+            data = {"mosi": buffer[pos:pos + 1], "miso": buffer[pos + 1:pos + 2]}
+            pos += 2
+            yield AnalyzerFrame("result", start_time, end_time, data)
+        else:
+            yield AnalyzerFrame(TRACE_KINDS[kind], start_time, end_time, {})
+
+
+def write_trace(path, frames):
+    """
+    Writes frames to a binary trace file, returns the number of frames written.
+    """
+    pack = TRACE_RECORD.pack
+    count = 0
+
+    with open(path, "wb") as file:
+        file.write(TRACE_MAGIC)
+        for frame in frames:
+            if frame.type == "result":
+                file.write(pack(1, frame.start_time, frame.end_time))
+                file.write(frame.data.get("mosi", b"\0")[:1] + frame.data.get("miso", b"\0")[:1])
+            else:
+                file.write(pack(TRACE_KINDS.index(frame.type), frame.start_time, frame.end_time))
+            count += 1
+
+    return count
+
+
+def read_mapped(path, start_time=None, end_time=None):
+    """
+    Yields the frames of the transactions of a mapped trace file that overlap start_time to end_time.
+    """
+    with MappedTrace(path) as trace:
+        yield from trace.range(start_time, end_time)
+
+
+def read_frames(path, start_time=None, end_time=None):
+    """
+    Yields the frames of a capture, binary and mapped trace files are recognized by their magic,
+    a time range can only be selected in mapped trace files.
+    """
+    if is_mapped(path):
+        return read_mapped(path, start_time, end_time)
+    if start_time is not None or end_time is not None:
+        raise ValueError(f"{path} is not a mapped trace file, convert it with --map to select a time range")
+
+    with open(path, "rb") as file:
+        is_trace = file.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+
+    return read_trace(path) if is_trace else read_csv(path)
+
+
+class Replay:
+    """
+    Runs frames through an analyzer and counts what went in and out.
+    """
+    def __init__(self, hla):
+        self.hla = hla
+        self.frames = 0
+        self.spi_bytes = 0
+        self.output_frames = 0
+        self.decode_time = 0.0
+
+    def run(self, frames):
+        """
+        Yields the frames produced by the analyzer.
+        """
+        decode = self.hla.decode
+        clock = time.perf_counter
+
+        for frame in frames:
+            self.frames += 1
+            if frame.type == "result":
+                self.spi_bytes += 1
+
+            started = clock()
+            result = decode(frame)
+            self.decode_time += clock() - started
+
+            if result is None:
+                continue
+            if isinstance(result, AnalyzerFrame):
+                result = (result,)
+            self.output_frames += len(result)
+            yield from result
+
+        # frames the analyzer holds back until the end of the capture
+        finish = getattr(self.hla, "finish", None)
+        if finish is not None:
+            result = finish()
+            self.output_frames += len(result)
+            yield from result
+
+    def summary(self):
+        seconds = self.decode_time or 1e-9
+        return (f"{self.frames} frames, {self.spi_bytes} SPI bytes -> {self.output_frames} frames "
+                f"in {self.decode_time:.3f} s: {self.frames / seconds:,.0f} frames/s, "
+                f"{self.spi_bytes / seconds:,.0f} bytes/s")
+
+
+def json_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+def frame_dict(frame):
+    return {
+        "type": frame.type,
+        "start_time": frame.start_time,
+        "end_time": frame.end_time,
+        "data": {key: json_value(value) for key, value in frame.data.items()},
+    }
+
+
+def write_jsonl(file, frames):
+    for frame in frames:
+        file.write(json.dumps(frame_dict(frame)))
+        file.write("\n")
+
+
+def write_csv(file, frames):
+    writer = csv.writer(file)
+    writer.writerow(("type", "start_time", "end_time", "data"))
+    for frame in frames:
+        record = frame_dict(frame)
+        writer.writerow((record["type"], record["start_time"], record["end_time"], json.dumps(record["data"])))
+
+
+def parse_settings(pairs):
+    settings = {}
+    for pair in pairs:
+        name, separator, value = pair.partition("=")
+        if not separator:
+            raise ValueError(f"setting '{pair}' is not name=value")
+        settings[name] = value
+    return settings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replays SPI captures through the High Level Analyzers.")
+    parser.add_argument("capture", help="Logic 2 SPI export (CSV), binary or mapped trace file")
+    parser.add_argument("-e", "--extension", choices=EXTENSIONS, default="EmbeddedVideoEngine5")
+    parser.add_argument("-o", "--output", help="output file, default is stdout")
+    parser.add_argument("-f", "--format", choices=("jsonl", "csv"), help="output format, default from the file name or jsonl")
+    parser.add_argument("-s", "--set", action="append", default=[], metavar="NAME=VALUE", help="analyzer setting")
+    parser.add_argument("--export", metavar="DIR", help="also write the transactions to a columnar export in DIR")
+    parser.add_argument("--convert", metavar="TRACE", help="write the capture to a binary trace file instead of decoding it")
+    parser.add_argument("--map", metavar="TRACE", help="write the capture to a mapped trace file instead of decoding it")
+    parser.add_argument("--start", type=float, help="decode from this time in seconds on, mapped trace files only")
+    parser.add_argument("--end", type=float, help="decode up to this time in seconds, mapped trace files only")
+    parser.add_argument("--checkpoints", type=int, metavar="N",
+                        help="store the decoder state every N transactions next to a mapped trace file for --start")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the throughput summary")
+    args = parser.parse_args(argv)
+
+    if args.convert:
+        count = write_trace(args.convert, read_frames(args.capture))
+        print(f"{count} frames written to {args.convert}", file=sys.stderr)
+        return 0
+
+    if args.map:
+        count = write_mapped(args.map, read_frames(args.capture))
+        print(f"{count} transactions written to {args.map}", file=sys.stderr)
+        return 0
+
+    settings = parse_settings(args.set)
+    if args.export:
+        settings["export"] = args.export
+    hla = load_analyzer(args.extension, settings)
+    replay = Replay(hla)
+    output_format = args.format or ("csv" if (args.output or "").endswith(".csv") else "jsonl")
+    writer = write_csv if output_format == "csv" else write_jsonl
+
+    trace = None
+    checkpoints = None
+    if args.checkpoints or (args.start is not None and is_mapped(args.capture)):
+        if not is_mapped(args.capture):
+            raise ValueError(f"{args.capture} is not a mapped trace file, convert it with --map to take checkpoints")
+        trace = MappedTrace(args.capture)
+
+    if trace is None:
+        output = replay.run(read_frames(args.capture, args.start, args.end))
+    elif args.checkpoints:
+        if args.start is not None or args.end is not None:
+            raise ValueError("checkpoints are taken while decoding the whole capture, without --start or --end")
+        hla.state()  # fails here for modes without checkpoints
+        checkpoints = []
+        output = replay.run(checkpointed(trace, hla, args.checkpoints, checkpoints))
+    else:
+        stored = load_checkpoints(checkpoint_path(args.capture), args.extension, settings, trace)
+        if stored is None:
+            output = replay.run(trace.range(args.start, args.end))
+        else:
+            start = args.start
+            output = (frame for frame in replay.run(resume(trace, hla, stored, start, args.end))
+                      if frame.end_time >= start)
+
+    if args.output:
+        with open(args.output, "w", newline="") as file:
+            writer(file, output)
+    else:
+        writer(sys.stdout, output)
+
+    if checkpoints is not None:
+        path = checkpoint_path(args.capture)
+        save_checkpoints(path, args.extension, settings, trace, args.checkpoints, checkpoints)
+        print(f"{len(checkpoints)} checkpoints written to {path}", file=sys.stderr)
+    if trace is not None:
+        trace.close()
+
+    if not args.quiet:
+        print(replay.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Stand-in for the saleae package of Logic 2, only used by the offline tools in this directory
@@ -0,0 +1,52 @@
+# Stand-in for saleae.analyzers from Logic 2
+#
+# Provides just enough of the High Level Analyzer API to run the extensions of this repository
+# outside of Logic 2, times are plain float seconds instead of SaleaeTime objects.
+
+
+class AnalyzerFrame:
+    def __init__(self, type, start_time, end_time, data=None):
+        self.type = type
+        self.start_time = start_time
+        self.end_time = end_time
+        self.data = data if data is not None else {}
+
+    def __repr__(self):
+        return f"AnalyzerFrame({self.type!r}, {self.start_time!r}, {self.end_time!r}, {self.data!r})"
+
+
+class Setting:
+    def __init__(self, label=None):
+        self.label = label
+
+    def default(self):
+        return None
+
+
+class StringSetting(Setting):
+    def default(self):
+        return ""
+
+
+class NumberSetting(Setting):
+    def __init__(self, label=None, min_value=None, max_value=None):
+        super().__init__(label)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def default(self):
+        return float(self.min_value or 0)
+
+
+class ChoiceSetting(Setting):
+    def __init__(self, choices, label=None):
+        super().__init__(label)
+        self.choices = tuple(choices)
+
+    def default(self):
+        return self.choices[0]
+
+
+class HighLevelAnalyzer:
+    def decode(self, frame):
+        raise NotImplementedError